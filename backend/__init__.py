@@ -6,6 +6,9 @@ from datetime import timedelta
 from backend.models import db
 from backend.auth import auth_bp
 from backend.config import Config
+from backend.services.jobs import init_jobs
+from backend.services.current_user import load_current_user
+from backend.services.request_metrics import init_request_metrics
 
 
 def create_app():
@@ -17,7 +20,7 @@ def create_app():
         r"/*": {
             "origins": ["https://bright-path-ai.vercel.app", "https://bright-path-ht0phbizx-dhurkesh-rs-projects.vercel.app", "https://bright-path-ai-git-main-dhurkesh-rs-projects.vercel.app"],
             "allow_headers": ["Content-Type", "Authorization"],
-            "expose_headers": ["Content-Type", "Authorization"],
+            "expose_headers": ["Content-Type", "Authorization", "X-Next-Cursor"],
             "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
         }
     })
@@ -66,6 +69,14 @@ def create_app():
             "msg": "The token has expired"
         }), 401
 
+    # ✅ JWT user lookup: `current_user` is loaded once per request, profiles included
+    @jwt.user_lookup_loader
+    def user_lookup_callback(jwt_header, jwt_payload):
+        return load_current_user(jwt_payload["sub"], app.config["CURRENT_USER_CACHE_TTL"])
+
+    @jwt.user_lookup_error_loader
+    def user_lookup_error_callback(jwt_header, jwt_payload):
+        return jsonify({"msg": "User not found"}), 401
 
     # ✅ 4. Setup Migrations
     migrate = Migrate(app, db)
@@ -73,4 +84,10 @@ def create_app():
     # ✅ 5. Register Blueprints
     app.register_blueprint(auth_bp)
 
+    # ✅ 6. Background jobs
+    init_jobs(app)
+
+    # ✅ 7. Per-route latency / SQL / LLM metrics (served at /metrics)
+    init_request_metrics(app)
+
     return app
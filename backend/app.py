@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+import time
 
 # Ensure project root is on sys.path so sibling packages like `ml_service` are importable when running backend/app.py directly
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -23,10 +24,11 @@ logging.basicConfig(
     ]
 )
 
+import hmac
 import json
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
+from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_current_user, get_jwt_identity
 from flask_migrate import Migrate
 import pandas as pd
 from werkzeug.utils import secure_filename
@@ -39,6 +41,7 @@ from flask import request
 from datetime import date, datetime
 from datetime import timedelta
 from backend.services.chatbot.chatbot import ChatBot
+from backend.services.chatbot.sessions import ChatSessionManager
 from backend import create_app
 
 from backend.models import *
@@ -51,8 +54,21 @@ from backend.models import *
 # from ml_service.services.risks_alerts import predict_academic_risk, predict_emotional_risk, predict_health_risk
 
 
-from backend.services.quiz_generator import generate_daily_quiz, generate_custom_quiz
-from backend.services.ai_pipeline import build_student_profile
+from backend.services.question_bank import QUESTION_BANK_RELEASE_BUDGET, QUIZ_DIFFICULTIES, custom_quiz, refill_popular_topics
+from backend.services.daily_quiz import generate_daily_quiz
+from backend.services.chat_analysis import score_chat_log, score_unscored_chat_logs
+from backend.services.quiz_analysis import analyze_quiz
+from backend.services.quiz_results import aggregate_answers, record_quiz_result, topic_rows
+from backend.services.ingestion import INGEST_BATCH_MAX_ITEMS, add_chat_logs, ingest_chat_logs, ingest_quiz_results
+from backend.services.current_user import forget_current_user
+from backend.services.ollama_client import get_ollama_client
+from backend.services.request_metrics import render_metrics
+from backend.services.rollups import move_student_rollups, section_scope, student_scope
+from backend.services.forecasts import cached_forecast
+from backend.services.realtime import conversation_room, publish_new_message, socketio_options, user_room
+from backend.services.conversations import THREAD_PAGE_SIZE, THREAD_MAX_PAGE_SIZE, decode_cursor, inbox, mark_conversation_read, parse_client_timestamp, record_message, thread_page
+from backend.services.section_data import fetch_section_students
+from backend.services.profile_store import enqueue_profile_refresh, load_profile_snapshots, snapshot_profile, snapshot_quiz_data
 from backend.services.analytics import *
 from backend.services.interventions import *
 from backend.services.progress import *
@@ -67,7 +83,11 @@ load_dotenv()
 
 app = create_app()
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    **socketio_options(app.config["SOCKETIO_MESSAGE_QUEUE"], app.config["SOCKETIO_CHANNEL"]),
+)
 import os
 from supabase import create_client, Client
 
@@ -92,7 +112,12 @@ CHILD_DATA = {
 # def create_tables():
 #     db.create_all()
 
-bot = ChatBot()
+chat_sessions = ChatSessionManager(
+    max_sessions=app.config["CHAT_MAX_SESSIONS"],
+    max_turns=app.config["CHAT_SESSION_MAX_TURNS"],
+    max_vectors=app.config["CHAT_SESSION_MAX_VECTORS"],
+    vector_dir=app.config["CHAT_VECTOR_DIR"],
+)
 
 @app.route('/chat-bot', methods=['POST'])
 @jwt_required()
@@ -103,11 +128,65 @@ def chat_bot():
     if not user_message:
         return jsonify({'error': 'No prompt provided'}), 400
 
-    # Temporarily disabled chatbot functionality
-    response = bot.chat(user_message)
+    session = chat_sessions.get(
+        int(get_jwt_identity()),
+        get_jwt().get("role", "student"),
+        data.get("conversation_id"),
+    )
+    response = session.chat(user_message)
     return jsonify({'response': response})
 
 
+
+def sse_event(data, event=None):
+    """One server-sent event carrying `data` as JSON."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@app.route('/chat-bot/stream', methods=['POST'])
+@jwt_required()
+def chat_bot_stream():
+    """
+    Streaming variant of /chat-bot (server-sent events): one
+    `data: {"token": ...}` event per chunk as the model produces it, then
+    `event: done` with the full reply once it has been saved to the session
+    memory and ChatLog, or `event: error` if generation failed.
+    """
+    data = request.get_json() or {}
+    user_message = data.get('prompt', "")
+
+    if not user_message:
+        return jsonify({'error': 'No prompt provided'}), 400
+
+    user_id = int(get_jwt_identity())
+    session = chat_sessions.get(user_id, get_jwt().get("role", "student"), data.get("conversation_id"))
+
+    def events():
+        chunks = []
+        try:
+            for chunk in session.stream_chat(user_message):
+                chunks.append(chunk)
+                yield sse_event({"token": chunk})
+        except Exception as e:
+            logging.error(f"Chat stream failed for user {user_id}: {e}")
+            yield sse_event({"error": "Unable to reach the AI service."}, event="error")
+            return
+
+        reply = "".join(chunks).strip()
+        chat = ChatLog(user_id=user_id, user_message=user_message, bot_response=reply)
+        db.session.add(score_chat_log(chat))
+        db.session.commit()
+        enqueue_profile_refresh(user_id)
+
+        yield sse_event({"response": reply}, event="done")
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # @app.route("/skill-interests", methods=["POST"])
 # @jwt_required()
 # def predict_skill_interests():
@@ -258,24 +337,25 @@ def add_activity():
     )
     db.session.add(activity)
     db.session.commit()
+    enqueue_profile_refresh(activity.user_id)
     return jsonify({"message": "Activity added", "activity": activity.to_dict()}), 201
 
 @app.route("/activities", methods=["GET"])
 @jwt_required()
 def fetch_activities():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     if user.role == "parent":
-        user = User.query.filter_by(email=user.parent_profile.child_email).first()
+        user = user.parent_profile.child
         user_id = user.id
 
-    activities = Activity.query.filter_by(user_id=user_id).all()
+    activities = Activity.query.filter_by(user_id=user_id).order_by(Activity.id).all()
     return jsonify([activity.to_dict() for activity in activities]), 200
 
 @app.route("/students/<int:student_id>/activities", methods=["GET"])
 @jwt_required()
 def fetch_student_activities(student_id):
-    activities = Activity.query.filter_by(user_id=student_id).all()
+    activities = Activity.query.filter_by(user_id=student_id).order_by(Activity.id).all()
     return jsonify([activity.to_dict() for activity in activities]), 200
 
 # -------------------
@@ -310,6 +390,7 @@ def update_activity(activity_id):
         activity.time_spent = data["timeSpent"]
 
     db.session.commit()
+    enqueue_profile_refresh(activity.user_id)
     return jsonify({"message": "Activity updated", "activity": activity.to_dict()})
 
 
@@ -323,8 +404,10 @@ def delete_activity(activity_id):
     if not activity:
         return jsonify({"error": "Activity not found"}), 404
 
+    student_id = activity.user_id
     db.session.delete(activity)
     db.session.commit()
+    enqueue_profile_refresh(student_id)
     return jsonify({"message": f"Activity {activity_id} deleted"})
 
 @app.route("/profile", methods=["GET"])
@@ -332,7 +415,7 @@ def delete_activity(activity_id):
 def get_user_profile():
     current_user_id = get_jwt_identity()
 
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -385,7 +468,7 @@ def update_user_profile():
     current_user_id = get_jwt_identity()
     data = request.get_json()
 
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -394,6 +477,7 @@ def update_user_profile():
     user.email = data.get("email", user.email)
 
     db.session.commit()
+    forget_current_user(user.id)
 
     # ---- Role-based profile update ----
     if user.role == "student":
@@ -409,7 +493,9 @@ def update_user_profile():
         profile.bio = data.get("bio", profile.bio)
         profile.profile_pic_url = data.get("profilePicUrl", profile.profile_pic_url)
 
+        move_student_rollups(user.id, user.school_id, profile.grade, profile.section)
         db.session.commit()
+        forget_current_user(user.id)
 
         return jsonify({
             "message": "Profile updated successfully",
@@ -445,6 +531,7 @@ def update_user_profile():
         profile.profile_pic_url = data.get("profilePicUrl", profile.profile_pic_url)
 
         db.session.commit()
+        forget_current_user(user.id)
 
         return jsonify({
             "message": "Profile updated successfully",
@@ -482,9 +569,9 @@ def update_user_profile():
 @jwt_required()
 def get_goals():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     if user.role == "parent":
-        user = User.query.filter_by(email=user.parent_profile.child_email).first()
+        user = user.parent_profile.child
         user_id = user.id
 
     goals = Goal.query.filter_by(user_id=user_id).all()
@@ -553,28 +640,13 @@ def send_quiz_results():
         return jsonify({"error": "Invalid quiz data"}), 400
 
     # ---- AGGREGATE PER SUBJECT ----
-    topic_map = {}
-
-    for q in raw_answers.values():
-        subject = q.get("subject", "Unknown")
-
-        topic_map.setdefault(subject, {"topic": subject, "correct": 0, "total": 0})
-        topic_map[subject]["total"] += 1
-
-        if q.get("isCorrect") is True:
-            topic_map[subject]["correct"] += 1
-
-    aggregated_summary = list(topic_map.values())
+    aggregated_summary = aggregate_answers(raw_answers)
 
     # ---- SAVE NORMALIZED DATA ----
-    result = QuizResult(
-        user_id=user_id,
-        summary_data=json.dumps(aggregated_summary),
-        taken_at=datetime.utcnow()
-    )
-
-    db.session.add(result)
+    user = get_current_user()
+    record_quiz_result(user, aggregated_summary)
     db.session.commit()
+    enqueue_profile_refresh(user.id)
 
     return jsonify({
         "status": "Quiz results saved",
@@ -594,25 +666,48 @@ def send_chat_data():
     if not user_id or not messages:
         return jsonify({"error": "Invalid chat data"}), 400
 
-    for msg in messages:
-        chat = ChatLog(
-            user_id=user_id,
-            user_message=msg.get("user_message"),
-            bot_response=msg.get("bot_response")
-        )
-        db.session.add(chat)
-
+    add_chat_logs(user_id, messages)
     db.session.commit()
+    enqueue_profile_refresh(user_id)
 
     return jsonify({"status": "Chat logs saved"}), 201
 
+
+@app.route("/send-batch", methods=["POST"])
+@jwt_required()
+def send_batch():
+    """
+    Batch ingestion of chat turns and quiz results, e.g. from a client that
+    was offline. Every item carries a client-generated "client_id"; items
+    already sent are reported as "duplicate" instead of stored again, so a
+    failed request can simply be retried.
+    """
+    data = request.get_json(silent=True) or {}
+    chat_items = data.get("chat_logs") or []
+    quiz_items = data.get("quiz_results") or []
+
+    if not isinstance(chat_items, list) or not isinstance(quiz_items, list) or not (chat_items or quiz_items):
+        return jsonify({"error": "Invalid batch"}), 400
+    if len(chat_items) + len(quiz_items) > INGEST_BATCH_MAX_ITEMS:
+        return jsonify({"error": f"At most {INGEST_BATCH_MAX_ITEMS} items per batch"}), 413
+
+    user = get_current_user()
+    chat_results = ingest_chat_logs(user.id, chat_items)
+    quiz_results = ingest_quiz_results(user, quiz_items)
+    db.session.commit()
+
+    if any(r["status"] == "created" for r in chat_results + quiz_results):
+        enqueue_profile_refresh(user.id)
+
+    return jsonify({"chat_logs": chat_results, "quiz_results": quiz_results}), 200
+
 @app.route("/student-profile/<int:user_id>", methods=["GET"])
 @jwt_required()
 def get_student_profile(user_id):
     # Fetch user + student profile
     user = User.query.get(user_id)
     if user.role == "parent":
-        user = User.query.filter_by(email=user.parent_profile.child_email).first()
+        user = user.parent_profile.child
         user_id = user.id
 
     if not user or user.role != "student":
@@ -622,47 +717,10 @@ def get_student_profile(user_id):
     if not student_profile:
         return jsonify({"error": "Student profile missing"}), 404
 
-    # Fetch DB data
-    chat_logs = ChatLog.query.filter_by(user_id=user_id).all()
-
-    latest_quiz = (
-        QuizResult.query
-        .filter_by(user_id=user_id)
-        .order_by(QuizResult.taken_at.desc())
-        .first()
-    )
-
-    quiz_data = []
-
-    if latest_quiz and latest_quiz.summary_data:
-            quiz_data = json.loads(latest_quiz.summary_data)
-
-    activities = Activity.query.filter_by(user_id=user_id).all()
-
-    # Extract chat messages
-    chat_data = []
-    for chat in chat_logs:
-        if chat.user_message:
-            chat_data.append({"message": chat.user_message})
-        if chat.bot_response:
-            chat_data.append({"message": chat.bot_response})
-
-    # ✅ Correct data source
-    student_info = {
-        "name": user.name,
-        "age": student_profile.age,
-        "grade": student_profile.grade,
-        "section": student_profile.section,
-        "school_id": user.school_id,
-        "profilePicUrl": student_profile.profile_pic_url
-    }
-
-    profile = build_student_profile(
-        quiz_data=quiz_data,
-        chat_data=chat_data,
-        student_info=student_info,
-        activities=activities,
-    )
+    snapshot = load_profile_snapshots([user])[user.id]
+    profile = snapshot_profile(snapshot, user)
+    profile["profileVersion"] = snapshot.version
+    profile["profileUpdatedAt"] = snapshot.updated_at.isoformat()
 
     return jsonify(profile), 200
 
@@ -680,7 +738,9 @@ def update_student_grade(user_id):
     # Update profile
     user.student_profile.grade = new_grade
     user.student_profile.section = new_section
+    move_student_rollups(user.id, user.school_id, new_grade, new_section)
     db.session.commit()
+    forget_current_user(user_id)
 
     # Return the full updated list (reuse your logic from delete)
     users = [u.to_admin_dict() for u in User.query.all()] 
@@ -690,7 +750,6 @@ def update_student_grade(user_id):
 @jwt_required()
 def get_daily_quiz():
     quizzes = generate_daily_quiz()
-    logging.info(quizzes)
     return jsonify(quizzes), 200
 
 
@@ -698,10 +757,18 @@ def get_daily_quiz():
 @jwt_required()
 def get_custom_quiz():
     data = request.json
-    topic = data.get("topic")
-    difficulty = data.get("difficulty", "medium")
-    count = data.get("count", 5)
-    quiz = generate_custom_quiz(topic, difficulty, count)
+    topic = (data.get("topic") or "").strip()
+    difficulty = str(data.get("difficulty", "medium")).lower()
+    try:
+        count = min(max(int(data.get("count", 5)), 1), 20)
+    except (TypeError, ValueError):
+        return jsonify({"error": "count must be a number"}), 400
+    if not topic:
+        return jsonify({"error": "topic is required"}), 400
+    if difficulty not in QUIZ_DIFFICULTIES:
+        return jsonify({"error": f"difficulty must be one of: {', '.join(QUIZ_DIFFICULTIES)}"}), 400
+
+    quiz = custom_quiz(topic, difficulty, count)
     return jsonify(quiz), 200
 
 @app.route("/upload-book", methods=["POST"])
@@ -736,7 +803,7 @@ def upload_book():
 @app.route("/books", methods=["GET"])
 @jwt_required()
 def get_books():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     
     books = Book.query.filter(Book.school_id==user.school_id).all()
     return jsonify([book.to_dict() for book in books]), 200
@@ -775,7 +842,7 @@ def change_password():
     if len(new_password) < 8:
         return jsonify({"error": "Password must be at least 8 characters"}), 400
 
-    user = User.query.get(user_id)
+    user = get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -787,6 +854,7 @@ def change_password():
     # 🔐 Hash and update new password
     user.password_hash = generate_password_hash(new_password)
     db.session.commit()
+    forget_current_user(user.id)
 
     return jsonify({"message": "Password updated successfully"}), 200
 
@@ -805,7 +873,7 @@ def get_students():
     section = request.args.get("section")    # e.g. "A"
     search = request.args.get("search")      # e.g. "ravi"
 
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
 
     # Base query: ONLY students
     query = (
@@ -814,8 +882,6 @@ def get_students():
         .filter(User.role == "student", User.school_id==user.school_id)
     )
 
-    logging.info(query)
-
     # Apply grade filter
     if grade and grade != "all":
         query = query.filter(StudentProfile.grade == grade)
@@ -832,8 +898,6 @@ def get_students():
 
     results = query.all()
 
-    logging.info(results)
-
     students = []
     for user, profile in results:
         students.append({
@@ -845,8 +909,6 @@ def get_students():
             "performance": profile.performance if hasattr(profile, "performance") else "Average"
         })
 
-    logging.info(students)
-
     return jsonify({
         "success": True,
         "count": len(students),
@@ -856,67 +918,27 @@ def get_students():
 @app.route("/analytics/class-summary", methods=["GET"])
 @jwt_required()
 def class_analytics():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     grade = request.args.get("grade")
     section = request.args.get("section")
 
-    students = (
-        User.query
-        .join(StudentProfile)
-        .filter(
-            User.role == "student",
-            User.school_id == user.school_id,
-            StudentProfile.grade == grade,
-            StudentProfile.section == section
-        )
-        .all()
-    )
-
-    profiles = []
-    quizzes = QuizResult.query.all()
-
-    for user in students:
-        latest_quiz = (
-            QuizResult.query
-            .filter_by(user_id=user.id)
-            .order_by(QuizResult.taken_at.desc())
-            .first()
-        )
-
-        chat_logs = ChatLog.query.filter_by(user_id=user.id).all()
+    students = fetch_section_students(user.school_id, grade, section)
+    snapshots = load_profile_snapshots(students)
 
-        quiz_data = []
-        if latest_quiz and latest_quiz.summary_data:
-            quiz_data = json.loads(latest_quiz.summary_data)  # ALWAYS list now
+    profiles = [snapshot_profile(snapshots[s.id], s) for s in students]
 
-        chat_data = []
-        for chat in chat_logs:
-            if chat.user_message:
-                chat_data.append({"message": chat.user_message})
-            if chat.bot_response:
-                chat_data.append({"message": chat.bot_response})
+    scope = section_scope(user.school_id, grade, section)
+    summary = aggregate_profiles(profiles, weekly_quiz_trend(*scope))
+    summary["forecast"] = cached_forecast(f"section:{user.school_id}:{grade}:{section}", *scope)
 
-        profile = build_student_profile(
-            quiz_data=quiz_data,
-            chat_data=chat_data,
-            student_info={
-                "name": user.name,
-                "grade": user.student_profile.grade,
-                "age": user.student_profile.age,
-                "profilePicUrl": user.student_profile.profile_pic_url
-            },
-            activities=Activity.query.filter_by(user_id=user.id).all()
-        )
-        profiles.append(profile)
-
-    return jsonify(aggregate_profiles(profiles, quizzes)), 200
+    return jsonify(summary), 200
 
 
 @app.route("/teacher-stats", methods=["GET"])
 @jwt_required()
 def teacher_stats():
     user_id = get_jwt_identity()
-    teacher = User.query.get(user_id)
+    teacher = get_current_user()
 
     if not teacher or teacher.role != "teacher":
         return jsonify({"error": "Unauthorized"}), 403
@@ -924,22 +946,7 @@ def teacher_stats():
     students_count = User.query.filter_by(school_id=teacher.school_id, role="student").count()
     books_count = Book.query.filter_by(school_id=teacher.school_id).count()
 
-    quiz_results = (
-        QuizResult.query
-        .join(User, QuizResult.user_id == User.id)
-        .filter(User.school_id == teacher.school_id)
-        .all()
-    )    
-
-    if not quiz_results:
-        avg_score = 0
-    else:
-        accuracies = []
-        for q in quiz_results:
-            quiz_data = json.loads(q.summary_data)  # ALWAYS list now
-            accuracies.append(compute_quiz_accuracy(quiz_data))
-
-        avg_score = round(sum(accuracies) / len(accuracies), 2)
+    avg_score = average_quiz_accuracy(*section_scope(teacher.school_id))
 
     return jsonify({
         "totalStudents": students_count,
@@ -951,42 +958,34 @@ def teacher_stats():
 @app.route("/performance-data", methods=["GET"])
 @jwt_required()
 def performance_data():
-    teacher = User.query.get(get_jwt_identity())
-    quiz_results = (
-        QuizResult.query
-        .join(User, QuizResult.user_id == User.id)
-        .filter(User.school_id == teacher.school_id)
-        .all()
-    )
-    all_quiz_summaries = [
-        json.loads(q.summary_data)
-        for q in quiz_results
-    ]
+    teacher = get_current_user()
 
-    data = subject_wise_performance(all_quiz_summaries)
-    logging.info(data)
+    data = subject_wise_performance(*section_scope(teacher.school_id))
     return jsonify(data)
 
 @app.route("/analytics/overview", methods=["GET"])
 @jwt_required()
 def analytics_overview():
-    teacher = User.query.get(get_jwt_identity())
-    students = User.query.filter_by(school_id=teacher.school_id, role="student").all()
-
-    all_quizzes = QuizResult.query.join(User, QuizResult.user_id == User.id).filter(User.school_id == teacher.school_id).all()
+    teacher = get_current_user()
+    student_ids = [
+        student_id
+        for (student_id,) in db.session.query(User.id).filter_by(school_id=teacher.school_id, role="student")
+    ]
 
-    weekly = weekly_quiz_trend(all_quizzes)
-    risks = risk_distribution(students)
+    scope = section_scope(teacher.school_id)
+    weekly = weekly_quiz_trend(*scope)
+    risks = risk_distribution(student_ids)
 
     return jsonify({
         "weeklyTrend": weekly,
-        "behaviorRisks": risks
+        "behaviorRisks": risks,
+        "forecast": cached_forecast(f"school:{teacher.school_id}", *scope)
     })
 
 @app.route("/books/recent", methods=["GET"])
 @jwt_required()
 def recent_books():
-    teacher = User.query.get(get_jwt_identity())
+    teacher = get_current_user()
     books = Book.query.filter_by(school_id=teacher.school_id).order_by(Book.uploaded_at.desc()).limit(6).all()
 
     return jsonify([
@@ -1004,7 +1003,7 @@ def recent_books():
 @app.route("/interventions", methods=["GET"])
 @jwt_required()
 def interventions():
-    teacher = User.query.get(get_jwt_identity())
+    teacher = get_current_user()
     if teacher.role != "teacher":
         return jsonify({"error": "Unauthorized"}), 403
 
@@ -1013,72 +1012,37 @@ def interventions():
     grade = request.args.get("grade")
     section = request.args.get("section")
 
-    students = (
-        User.query
-        .join(StudentProfile)
-        .filter(
-            User.role == "student",
-            StudentProfile.grade == grade,
-            StudentProfile.section == section,
-            User.school_id == teacher.school_id,
-        )
-        .all()
-    )
+    students = fetch_section_students(teacher.school_id, grade, section)
+    snapshots = load_profile_snapshots(students)
 
-    results = []
+    # Only students who have taken at least one quiz
+    students = [s for s in students if snapshots[s.id].quiz_data is not None]
 
+    contexts = []
     for student in students:
-        latest_quiz = (
-            QuizResult.query
-            .filter_by(user_id=student.id)
-            .order_by(QuizResult.taken_at.desc())
-            .first()
-        )
-
-        if not latest_quiz:
-            continue
-
-        quiz_data = json.loads(latest_quiz.summary_data)
-        quiz_analysis = analyze_quiz(quiz_data)
-
-        chat_logs = ChatLog.query.filter_by(user_id=student.id).all()
-
-
-        chat_data = []
-        for chat in chat_logs:
-            if chat.user_message:
-                chat_data.append({"message": chat.user_message})
-            if chat.bot_response:
-                chat_data.append({"message": chat.bot_response})
-
-        activities = Activity.query.filter_by(user_id=student.id).all()
-
-        profile = build_student_profile(
-            quiz_data=quiz_data,
-            chat_data=chat_data,
-            student_info={
-                "name": student.name,
-                "grade": student.student_profile.grade,
-                "age": student.student_profile.age,
-                "profilePicUrl": student.student_profile.profile_pic_url
-            },
-            activities=activities,
-        )
-
-        context = build_intervention_context(student, quiz_analysis, profile)
-
-        intervention_text = generate_intervention_text(context, chatbot)
-        if not intervention_text:
-            intervention_text = fallback_intervention(context)
+        snapshot = snapshots[student.id]
+        quiz_analysis = analyze_quiz(snapshot_quiz_data(snapshot))
+        contexts.append(build_intervention_context(student, quiz_analysis, snapshot_profile(snapshot, student)))
+
+    texts = cached_interventions(
+        [s.id for s in students],
+        contexts,
+        chatbot,
+        max_workers=app.config["INTERVENTION_MAX_WORKERS"],
+        time_budget=app.config["INTERVENTION_TIME_BUDGET"],
+        ttl_hours=app.config["INTERVENTION_CACHE_TTL_HOURS"],
+        max_entries=app.config["INTERVENTION_CACHE_MAX_ENTRIES"],
+    )
 
-        results.append({
+    results = [
+        {
             "studentId": student.id,
             "studentName": student.name,
             "riskLevel": "High" if context["academic_risk"] else "Moderate",
-            "intervention": intervention_text
-        })
-
-        logging.info(results)
+            "intervention": text
+        }
+        for student, context, text in zip(students, contexts, texts)
+    ]
 
     return jsonify(results), 200
 
@@ -1087,7 +1051,7 @@ def interventions():
 @jwt_required()
 def create_assignment():
     user_id = get_jwt_identity()
-    teacher = User.query.get(user_id)
+    teacher = get_current_user()
 
     if teacher.role != "teacher":
         return jsonify({"error": "Unauthorized"}), 403
@@ -1111,7 +1075,7 @@ def create_assignment():
 @app.route("/assignments", methods=["GET"])
 @jwt_required()
 def list_assignments():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
 
     if user.role == "teacher":
         assignments = Assignment.query.filter_by(created_by=user.id).all()
@@ -1141,7 +1105,7 @@ def update_assignment(assignment_id):
     if not assignment:
         return jsonify({"error": "Activity not found"}), 404
 
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
 
     if user.role != "teacher":
         return jsonify({"error": "Unauthorized"}), 403
@@ -1183,7 +1147,7 @@ def delete_assignment(assignment_id):
 @app.route("/assignments/<int:assignment_id>/student/<int:student_id>", methods=["GET"])
 @jwt_required()
 def get_assignment_status(assignment_id, student_id):
-    teacher = User.query.get(get_jwt_identity())
+    teacher = get_current_user()
     if teacher.role != "teacher":
         return jsonify({"error": "Unauthorized"}), 403
 
@@ -1199,7 +1163,7 @@ def get_assignment_status(assignment_id, student_id):
 @app.route("/assignments/<int:assignment_id>/student/<int:student_id>", methods=["PUT"])
 @jwt_required()
 def update_assignment_status(assignment_id, student_id):
-    teacher = User.query.get(get_jwt_identity())
+    teacher = get_current_user()
 
     if teacher.role != "teacher":
         return jsonify({"error": "Unauthorized"}), 403
@@ -1236,10 +1200,6 @@ def update_assignment_status(assignment_id, student_id):
 
     return jsonify({"status": submission.status})
 
-def conversation_room(user1_id, user2_id):
-    low, high = sorted([int(user1_id), int(user2_id)])
-    return f"conversation_{low}_{high}"
-
 @socketio.on("join_conversation")
 def join_conversation(data):
     token = data["auth"]
@@ -1278,7 +1238,7 @@ def handle_connect(auth):
         decoded = decode_token(token)
         user_id = decoded["sub"]
 
-        join_room(f"user_{user_id}")
+        join_room(user_room(user_id))
 
         print(f"🟢 Socket connected for user {user_id}")
 
@@ -1290,33 +1250,21 @@ def handle_connect(auth):
 @jwt_required()
 def conversations():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
 
     if user.role == "student":
         return jsonify({"error": "Unauthorized"}), 403
 
-    # All parents this teacher has chatted with
-    conversations = (
-        db.session.query(User.id, User.name)
-        .join(Message, Message.sender_id == User.id)
-        .filter(Message.receiver_id == user_id)
-        .distinct()
-        .all()
-    )
-
-    sent_conversations = (
-        db.session.query(User.id, User.name)
-        .join(Message, Message.receiver_id == User.id)
-        .filter(Message.sender_id == user_id)
-        .distinct()
-        .all()
-    )
-
-    users = {uid: name for uid, name in conversations + sent_conversations}
-
+    # Everyone this user has chatted with, most recent conversation first
     return jsonify([
-        {"userId": uid, "name": name}
-        for uid, name in users.items()
+        {
+            "userId": summary.peer_id,
+            "name": name,
+            "lastMessage": summary.last_message,
+            "lastMessageAt": summary.last_message_at,
+            "unread": summary.unread_count
+        }
+        for summary, name in inbox(user_id)
     ])
 
 @app.route("/messages/thread/<int:other_user_id>", methods=["GET"])
@@ -1324,25 +1272,17 @@ def conversations():
 def message_thread(other_user_id):
     user_id = get_jwt_identity()
 
-    messages = (
-        Message.query
-        .filter(
-            db.or_(
-                db.and_(
-                    Message.sender_id == user_id,
-                    Message.receiver_id == other_user_id
-                ),
-                db.and_(
-                    Message.sender_id == other_user_id,
-                    Message.receiver_id == user_id
-                )
-            )
-        )
-        .order_by(Message.created_at.asc())
-        .all()
-    )
+    # Newest page first; older pages via ?before=<X-Next-Cursor of the previous page>
+    limit = min(max(request.args.get("limit", THREAD_PAGE_SIZE, type=int), 1), THREAD_MAX_PAGE_SIZE)
+    before = request.args.get("before")
+    try:
+        before = decode_cursor(before) if before else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    return jsonify([
+    messages, next_cursor = thread_page(user_id, other_user_id, limit, before)
+
+    response = jsonify([
         {
             "id": m.id,
             "senderId": m.sender_id,
@@ -1353,6 +1293,9 @@ def message_thread(other_user_id):
         }
         for m in messages
     ])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @app.route("/messages/send", methods=["POST"])
 @jwt_required()
@@ -1368,24 +1311,22 @@ def send_message():
         sender_id=sender_id,
         receiver_id=receiver_id,
         content=content,
-        created_at=created_at
+        created_at=parse_client_timestamp(created_at)
     )
     db.session.add(message)
+    db.session.flush()
+    record_message(message)
+    message_id = message.id
     db.session.commit()
 
-    room = conversation_room(sender_id, receiver_id)
-
-    socketio.emit(
-        "new_message",
-        {
-            "id": message.id,
-            "senderId": int(sender_id),
-            "receiverId": receiver_id,
-            "content": content,
-            "createdAt": created_at
-        },
-        room=room,
-    )
+    # Reaches the recipients on whichever worker holds their socket
+    publish_new_message(socketio, {
+        "id": message_id,
+        "senderId": int(sender_id),
+        "receiverId": receiver_id,
+        "content": content,
+        "createdAt": created_at
+    })
 
     return jsonify({"success": True}), 201
 
@@ -1412,6 +1353,7 @@ def mark_messages_read(thread_user_id):
         Message.receiver_id == user_id,
         Message.read == False
     ).update({"read": True})
+    mark_conversation_read(user_id, thread_user_id)
 
     db.session.commit()
 
@@ -1421,7 +1363,7 @@ def mark_messages_read(thread_user_id):
 @jwt_required()
 def get_parents_for_teacher():
     user_id = get_jwt_identity()
-    teacher = User.query.get(user_id)
+    teacher = get_current_user()
 
     if not teacher or teacher.role != "teacher":
         return jsonify({"error": "Unauthorized"}), 403
@@ -1464,12 +1406,12 @@ def get_parents_for_teacher():
 @jwt_required()
 def get_teachers_for_parent():
     user_id = get_jwt_identity()
-    parent = User.query.get(user_id)
+    parent = get_current_user()
 
     if not parent or parent.role != "parent":
         return jsonify({"error": "Unauthorized"}), 403
 
-    child = User.query.filter_by(email=parent.parent_profile.child_email).first()
+    child = parent.parent_profile.child
 
     # 1. Get students from same school
     teachers = (
@@ -1496,13 +1438,6 @@ def get_teachers_for_parent():
 def build_parent_report(student_id, student, period="weekly"):
     now = datetime.utcnow()
     start = now - timedelta(days=7 if period == "weekly" else 30)
-    logging.info(now)
-    logging.info(start)
-
-    quizzes = QuizResult.query.filter(
-        QuizResult.user_id == student_id,
-        QuizResult.taken_at >= start
-    ).all()
 
     assignments = Assignment.query.filter(
         Assignment.grade == student.student_profile.grade,
@@ -1512,21 +1447,17 @@ def build_parent_report(student_id, student, period="weekly"):
     activities = Activity.query.filter(
         Activity.user_id == student_id,
         Activity.created_at >= start
-    ).all()
+    ).order_by(Activity.id).all()
 
     goals = Goal.query.filter(
         Goal.user_id == student_id
     ).all()
 
     # ---- Academic ----
-    quiz_data = []
-    for q in quizzes:
-        quiz_data.extend(
-            json.loads(q.summary_data)
-        )
-
-    logging.info(quiz_data)
-    logging.info(quizzes)
+    quiz_data = topic_rows(
+        QuizTopicResult.user_id == student_id,
+        QuizTopicResult.taken_at >= start
+    )
 
     academic_analysis = analyze_quiz(quiz_data)
 
@@ -1549,9 +1480,6 @@ def build_parent_report(student_id, student, period="weekly"):
     # ---- Goals ----
     completed_goals = len([g for g in goals if g.status == "completed"])
     overdue_goals = len([g for g in goals if g.status != "completed" if g.deadline < now])
-    logging.info(overdue_goals)
-    logging.info(academic_analysis["topic_analysis"])
-
 
     return {
         "academics": {
@@ -1581,8 +1509,8 @@ def build_parent_report(student_id, student, period="weekly"):
 @app.route("/parent/reports", methods=["GET"])
 @jwt_required()
 def parent_reports():
-    parent = User.query.get(get_jwt_identity())
-    student = User.query.filter_by(email=parent.parent_profile.child_email).first()
+    parent = get_current_user()
+    student = parent.parent_profile.child
     student_id = student.id
     period = request.args.get("period", "weekly")
 
@@ -1595,17 +1523,16 @@ def parent_reports():
 def parent_progress():
     period = request.args.get("period", "weekly")
 
-    parent = User.query.get(get_jwt_identity())
-    student = User.query.filter_by(email=parent.parent_profile.child_email).first()
+    parent = get_current_user()
+    student = parent.parent_profile.child
     student_id = student.id
     if parent.role != "parent":
         return jsonify({"error": "Unauthorized"}), 403
     # --- Fetch data ---
-    quizzes = QuizResult.query.filter_by(user_id=student_id).all()
     activities = Activity.query.filter_by(user_id=student_id).all()
 
     # --- Compute progress ---
-    academic_latest, academic_trend = academic_progress(quizzes, period)
+    academic_latest, academic_trend = academic_progress(student_id, period)
     creative_latest, creative_trend = activity_progress(
         activities, "art", period, "creative"
     )
@@ -1643,23 +1570,23 @@ def parent_progress():
         "trend": trend,
         "insight": generate_progress_insight(
             academic_latest, creative_latest, sports_latest
-        )
+        ),
+        "forecast": cached_forecast(f"student:{student_id}", *student_scope(student_id))
     })
 
 @app.route("/parent/recommendations", methods=["GET"])
 @jwt_required()
 def parent_recommendations():
-    parent = User.query.get(get_jwt_identity())
-    student = User.query.filter_by(email=parent.parent_profile.child_email).first()
+    parent = get_current_user()
+    student = parent.parent_profile.child
     student_id = student.id
     if parent.role != "parent":
         return jsonify({"error": "Unauthorized"}), 403
 
     # --- Pull progress summary (reuse logic) ---
-    quizzes = QuizResult.query.filter_by(user_id=student_id).all()
     activities = Activity.query.filter_by(user_id=student_id).all()
 
-    academic, _ = academic_progress(quizzes, "monthly")
+    academic, _ = academic_progress(student_id, "monthly")
     creative, _ = activity_progress(activities, "art", "monthly", "creative")
     sports, _ = activity_progress(activities, "sports", "monthly", "sports")
 
@@ -1688,7 +1615,7 @@ def parent_recommendations():
 def get_parent_notifications():
     parent_id = get_jwt_identity()
 
-    parent = User.query.get(parent_id)
+    parent = get_current_user()
     if parent.role != "parent":
         return jsonify({"error": "Unauthorized"}), 403
 
@@ -1736,9 +1663,23 @@ def health_check():
     return jsonify({
         "status": "online",
         "message": "Backend is awake and ready!",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "llm": get_ollama_client().metrics.snapshot()
     }), 200
 
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Per-route request metrics of this worker, in Prometheus text format."""
+    token = app.config["METRICS_TOKEN"]
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return Response(
+        render_metrics(llm=get_ollama_client().metrics.snapshot()),
+        mimetype="text/plain; version=0.0.4",
+    )
+
 from flask import jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 
@@ -1749,7 +1690,7 @@ def get_all_users():
     if claims.get("role") != "admin":
         return jsonify({"error": "Unauthorized. Admin access required."}), 403
 
-    admin = User.query.get(get_jwt_identity())
+    admin = get_current_user()
 
     users = [u.to_admin_dict() for u in User.query.filter_by(school_id=admin.school_id).all()]
     return jsonify(users), 200
@@ -1772,6 +1713,8 @@ def admin_delete_user(user_id):
 
     db.session.delete(user)
     db.session.commit()
+    forget_current_user(user_id)
+    chat_sessions.drop(user_id)
     
     users = [u.to_admin_dict() for u in User.query.all()]
     return jsonify(users), 200
@@ -1786,7 +1729,7 @@ def get_admin_stats():
     if claims.get("role") != "admin":
         return jsonify({"error": "Admin access required"}), 403
         
-    admin = User.query.get(get_jwt_identity())
+    admin = get_current_user()
     
     # 1. Basic Counts
     total_users = User.query.filter_by(school_id=admin.school_id).count()
@@ -1878,6 +1821,7 @@ def verify_user(user_id):
     
     try:
         db.session.commit()
+        forget_current_user(user_id)
         # Logic for sending a "Welcome/Verified" email could go here
         return jsonify({
             "message": f"User {user.name} has been verified successfully.",
@@ -1893,7 +1837,7 @@ def manage_classes():
     claims = get_jwt()
     if claims.get("role") != "admin":
         return jsonify({"error": "Admin access only"}), 403
-    admin = User.query.get(get_jwt_identity())
+    admin = get_current_user()
 
     if request.method == "POST":
         data = request.json
@@ -1931,7 +1875,7 @@ def get_available_teachers():
     claims = get_jwt()
     if claims.get("role") != "admin":
         return jsonify({"error": "Unauthorized"}), 403
-    admin = User.query.get(get_jwt_identity())
+    admin = get_current_user()
     # Fetch all teachers
     teachers = User.query.filter_by(school_id=admin.school_id, role='teacher').all()
     
@@ -1999,7 +1943,7 @@ def manage_announcements():
 @jwt_required()
 def get_user_announcements():
     user_role = get_jwt().get("role")
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if user_role == "admin":
         announcements = Announcement.query.order_by(Announcement.created_at.desc()).all()
     else:
@@ -2022,7 +1966,7 @@ def get_registered_schools():
 @jwt_required()
 def update_announcement(id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if user.role != 'admin':
         return jsonify({"msg": "Unauthorized"}), 403
@@ -2042,7 +1986,7 @@ def update_announcement(id):
 @jwt_required()
 def delete_announcement(id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if user.role != 'admin':
         return jsonify({"msg": "Unauthorized"}), 403
@@ -2053,5 +1997,30 @@ def delete_announcement(id):
     
     return jsonify({"msg": "Deleted successfully"}), 200
 
+# Maintenance commands, run once per deploy (see the Procfile release
+# phase) instead of on import, where every worker would repeat them.
+
+@app.cli.command("score-chat-logs")
+def score_chat_logs_command():
+    """Scores chat logs written before per-row scores existed."""
+    score_unscored_chat_logs()
+
+
+@app.cli.command("refill-question-bank")
+def refill_question_bank_command():
+    """
+    Tops up the popular custom-quiz topics before anyone asks for them.
+    Best effort: bounded by QUESTION_BANK_RELEASE_BUDGET and never fails,
+    so a slow or unreachable Ollama can't hold up or fail a release.
+    """
+    try:
+        refill_popular_topics(
+            background=False, deadline=time.monotonic() + QUESTION_BANK_RELEASE_BUDGET
+        )
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Question bank refill failed: {e}")
+
+
 if __name__ == "__main__":
     socketio.run(app, debug=True)
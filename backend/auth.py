@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from backend.utils.security import hash_password, verify_password
-from backend.services.notifications import generate_parent_notifications
+from backend.services.notifications import enqueue_parent_notifications
 from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt_identity, jwt_required
 
 auth_bp = Blueprint("auth", __name__)
@@ -98,7 +98,7 @@ def login():
         return jsonify({"error": "Invalid credentials"}), 401
 
     if user.role == "parent":
-        generate_parent_notifications()
+        enqueue_parent_notifications(user.id)
 
     access_token = create_access_token(
         identity=str(user.id),
@@ -7,3 +7,17 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+    INTERVENTION_MAX_WORKERS = int(os.getenv("INTERVENTION_MAX_WORKERS", 4))
+    INTERVENTION_TIME_BUDGET = float(os.getenv("INTERVENTION_TIME_BUDGET", 60))
+    INTERVENTION_CACHE_TTL_HOURS = float(os.getenv("INTERVENTION_CACHE_TTL_HOURS", 24 * 7))
+    INTERVENTION_CACHE_MAX_ENTRIES = int(os.getenv("INTERVENTION_CACHE_MAX_ENTRIES", 5000))
+    CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", 500))
+    CHAT_SESSION_MAX_TURNS = int(os.getenv("CHAT_SESSION_MAX_TURNS", 10))
+    CHAT_SESSION_MAX_VECTORS = int(os.getenv("CHAT_SESSION_MAX_VECTORS", 200))
+    CHAT_VECTOR_DIR = os.getenv("CHAT_VECTOR_DIR")  # unset = in-memory vector memories only
+    CURRENT_USER_CACHE_TTL = float(os.getenv("CURRENT_USER_CACHE_TTL", 0))  # seconds; 0 = no cross-request cache
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")  # e.g. redis://host:6379/0; unset = single worker fan-out
+    SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "flask-socketio")
+    REQUEST_LATENCY_BUDGET = float(os.getenv("REQUEST_LATENCY_BUDGET", 2.0))  # seconds; 0 = no warning
+    REQUEST_QUERY_BUDGET = int(os.getenv("REQUEST_QUERY_BUDGET", 50))  # SQL statements per request; 0 = no warning
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # bearer token required on /metrics; unset = open
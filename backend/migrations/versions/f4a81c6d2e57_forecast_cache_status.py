@@ -0,0 +1,36 @@
+"""Failed fits in forecast_cache
+
+Revision ID: f4a81c6d2e57
+Revises: e26b4f9c8a13
+Create Date: 2026-10-18 09:12:40.118362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a81c6d2e57'
+down_revision = 'e26b4f9c8a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('forecast_cache', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=20), nullable=True))
+
+    op.execute("UPDATE forecast_cache SET status = 'ready' WHERE status IS NULL")
+
+    with op.batch_alter_table('forecast_cache', schema=None) as batch_op:
+        batch_op.alter_column('status', existing_type=sa.String(length=20), nullable=False)
+        batch_op.alter_column('forecast', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade():
+    # Scopes that never had a successful fit cannot be kept without a forecast
+    op.execute("DELETE FROM forecast_cache WHERE forecast IS NULL")
+
+    with op.batch_alter_table('forecast_cache', schema=None) as batch_op:
+        batch_op.alter_column('forecast', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('status')
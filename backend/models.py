@@ -103,6 +103,10 @@ class StudentProfile(db.Model):
 
     user = db.relationship("User", back_populates="student_profile")
 
+    __table_args__ = (
+        db.Index("ix_student_profiles_grade_section", "grade", "section"),
+    )
+
 class TeacherProfile(db.Model):
     __tablename__ = "teacher_profiles"
 
@@ -139,6 +143,13 @@ class ParentProfile(db.Model):
     profile_pic_url = db.Column(db.Text)
 
     user = db.relationship("User", back_populates="parent_profile")
+    # The linked student account, matched on its login email
+    child = db.relationship(
+        "User",
+        primaryjoin="ParentProfile.child_email == foreign(User.email)",
+        uselist=False,
+        viewonly=True,
+    )
 
 class Activity(db.Model):
     __tablename__ = "activities"
@@ -151,7 +162,11 @@ class Activity(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Optional: Link activities to a user (if you want user-specific activities)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_activities_user_created_at", "user_id", "created_at"),
+    )
 
     def to_dict(self):
         """Helper to return dict (useful for JSON responses)."""
@@ -198,6 +213,22 @@ class QuizResult(db.Model):
     taken_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     user = db.relationship("User", back_populates="quiz_results")
+    topics = db.relationship(
+        "QuizTopicResult",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="QuizTopicResult.id"
+    )
+
+    # Client-supplied id of batch-ingested results (retries are no-ops)
+    client_id = db.Column(db.String(64))
+
+    __table_args__ = (
+        # Latest quiz per student: served from the head of the index
+        db.Index("ix_quiz_results_user_taken_at", user_id, taken_at.desc()),
+        db.UniqueConstraint("user_id", "client_id", name="uq_quiz_results_user_client_id"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -207,17 +238,85 @@ class QuizResult(db.Model):
         }
 
 
+class QuizTopicResult(db.Model):
+    """One row per topic of a QuizResult, so analytics can aggregate in SQL."""
+    __tablename__ = "quiz_topic_results"
+
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_result_id = db.Column(db.Integer, db.ForeignKey("quiz_results.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    school_id = db.Column(db.Integer, db.ForeignKey("schools.id"), nullable=True, index=True)
+    topic = db.Column(db.String(100), nullable=False)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    taken_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {
+            "topic": self.topic,
+            "correct": self.correct,
+            "total": self.total,
+        }
+
+
+class AcademicRollup(db.Model):
+    """
+    Incrementally maintained quiz aggregates per week/month.
+
+    user_id = 0 marks a whole grade/section row, subject = "" marks the
+    all-subjects row (the one carrying per-quiz accuracy sums).
+    """
+    __tablename__ = "academic_rollups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    school_id = db.Column(db.Integer, nullable=False, default=0)
+    grade = db.Column(db.String(10), nullable=False, default="")
+    section = db.Column(db.String(5), nullable=False, default="")
+    user_id = db.Column(db.Integer, nullable=False, default=0)
+    subject = db.Column(db.String(100), nullable=False, default="")
+    period = db.Column(db.String(10), nullable=False)  # week, month
+    period_start = db.Column(db.Date, nullable=False)
+
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    quiz_count = db.Column(db.Integer, nullable=False, default=0)
+    accuracy_sum = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "school_id", "grade", "section", "user_id", "subject", "period", "period_start",
+            name="uq_academic_rollup_key"
+        ),
+        db.Index("ix_academic_rollups_user_period", "user_id", "period", "period_start"),
+        db.Index("ix_academic_rollups_school_period", "school_id", "period", "period_start"),
+    )
+
+
 class ChatLog(db.Model):
     __tablename__ = "chat_logs"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     user = db.relationship("User", back_populates="chat_logs")
     user_message = db.Column(db.Text)
     bot_response = db.Column(db.Text)
     sent_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Stored at write time (NULL = not scored yet, see chat_analysis)
+    sentiment_sum = db.Column(db.Float)
+    message_count = db.Column(db.Integer)
+    curiosity_count = db.Column(db.Integer)
+    help_count = db.Column(db.Integer)
+
+    # Client-supplied id of batch-ingested turns (retries are no-ops)
+    client_id = db.Column(db.String(64))
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "client_id", name="uq_chat_logs_user_client_id"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -317,6 +416,29 @@ class Message(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     read = db.Column(db.Boolean, default=False)
 
+    __table_args__ = (
+        db.Index("ix_message_thread", "sender_id", "receiver_id", "created_at"),
+        db.Index("ix_message_receiver_read", "receiver_id", "read"),
+    )
+
+class ConversationSummary(db.Model):
+    """Inbox row of `owner` for the conversation with `peer`, updated on every message."""
+    __tablename__ = "conversation_summaries"
+
+    id = db.Column(db.Integer, primary_key=True)
+    owner_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    peer_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    last_message = db.Column(db.Text)
+    last_sender_id = db.Column(db.Integer)
+    last_message_at = db.Column(db.DateTime)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)  # messages from peer not read by owner
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("owner_id", "peer_id", name="uq_conversation_summary_pair"),
+        db.Index("ix_conversation_summaries_owner_last", owner_id, last_message_at.desc()),
+    )
+
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, nullable=False)  # parent
@@ -327,6 +449,92 @@ class Notification(db.Model):
     severity = db.Column(db.String(20))  # info, warning, critical
     read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    detector = db.Column(db.String(50))  # academic_drop, missed_goals, inactivity_<category>
+    period = db.Column(db.String(20))  # ISO week, e.g. "2026-W42"
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "detector", "period", name="uq_notification_detector_period"),
+        db.Index("ix_notification_user_created_at", user_id, created_at.desc()),
+    )
+
+class InterventionCache(db.Model):
+    __tablename__ = "intervention_cache"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # sha256 of the intervention context the text was generated from
+    fingerprint = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    student_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    intervention = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class StudentProfileSnapshot(db.Model):
+    """Materialized dashboard profile, refreshed whenever the student's data changes."""
+    __tablename__ = "student_profile_snapshots"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
+    profile_data = db.Column(db.Text, nullable=False)  # JSON built by build_student_profile
+    quiz_data = db.Column(db.Text)  # JSON topics of the latest quiz, NULL = no quiz yet
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ForecastCache(db.Model):
+    """Latest accuracy forecast per scope ("student:<id>", "section:<school>:<grade>:<section>", ...)."""
+    __tablename__ = "forecast_cache"
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope_key = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    # sha256 of the weekly series the forecast was (last) fitted on
+    data_fingerprint = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="ready")  # ready, failed
+    # JSON of the latest successful fit; a failed refit keeps it, NULL if none ever succeeded
+    forecast = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DailyQuiz(db.Model):
+    """Quiz of the day shared by every worker; "generating" marks the worker currently building it, "failed" its last failed attempt."""
+    __tablename__ = "daily_quizzes"
+
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_date = db.Column(db.Date, unique=True, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="generating")  # generating, ready, failed
+    quiz_data = db.Column(db.Text)  # JSON {subject: [question, ...]}, NULL while generating
+    claimed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class QuestionBankTopic(db.Model):
+    """Demand for a custom-quiz topic; the most requested ones are kept stocked."""
+    __tablename__ = "question_bank_topics"
+
+    id = db.Column(db.Integer, primary_key=True)
+    topic_key = db.Column(db.String(200), nullable=False)  # normalized topic
+    difficulty = db.Column(db.String(20), nullable=False)
+    topic = db.Column(db.String(200), nullable=False)  # as last asked for
+    request_count = db.Column(db.Integer, nullable=False, default=0)
+    last_requested_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("topic_key", "difficulty", name="uq_question_bank_topic"),
+        db.Index("ix_question_bank_topics_popularity", "request_count"),
+    )
+
+class QuestionBankQuestion(db.Model):
+    """One generated multiple-choice question, deduplicated per topic/difficulty by its hash."""
+    __tablename__ = "question_bank_questions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    topic_key = db.Column(db.String(200), nullable=False)
+    difficulty = db.Column(db.String(20), nullable=False)
+    question_hash = db.Column(db.String(64), nullable=False)  # sha256 of the normalized question text
+    question = db.Column(db.Text, nullable=False)  # JSON {"question", "options", "answer"}
+    served_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("topic_key", "difficulty", "question_hash", name="uq_question_bank_question"),
+        db.Index("ix_question_bank_questions_topic_served", "topic_key", "difficulty", "served_count"),
+    )
 
 class SchoolClass(db.Model):
     __tablename__ = 'school_classes'
@@ -0,0 +1,276 @@
+# backend/scripts/benchmark_endpoints.py
+"""
+Latency / query-count benchmark of the heavy endpoints.
+
+Calls the dashboard, parent report, messaging and quiz endpoints through
+the Flask test client against a seeded database (see seed_synthetic.py)
+and reports p50/p95/max latency, SQL statements per call and response
+size. Ollama is replaced by a local stub server answering every prompt
+instantly (or after --llm-delay per streamed chunk), so the numbers
+measure the app and its queries, not the model:
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m backend.scripts.benchmark_endpoints \\
+        --iterations 30 --output bench-before.json
+    ... --baseline bench-before.json   # after the change
+
+With --baseline, routes whose p95 grew by more than --tolerance or that
+run more SQL statements than before are reported as regressions (exit 1).
+The app is imported as in production, so its environment (SUPABASE_*,
+...) must be set; OLLAMA_HOST is overridden. Calls write only what the
+endpoints themselves write (caches, question bank).
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, func
+
+from backend.models import db, User, ParentProfile, QuizResult, SchoolClass, ConversationSummary
+
+STUB_QUESTIONS = [
+    {
+        "id": f"Stub-{i}",
+        "subject": "Stub",
+        "question": f"Benchmark question {i}?",
+        "options": ["A", "B", "C", "D"],
+        "answer": "A",
+    }
+    for i in range(1, 11)
+]
+STUB_REPLY = "Keep practising the weak topics for ten minutes a day and review mistakes together."
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """/api/generate in streaming mode: quiz prompts get questions, anything else a short reply."""
+
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body.get("prompt", "")
+        text = json.dumps(STUB_QUESTIONS) if "multiple-choice" in prompt else STUB_REPLY
+        chunks = [text[i:i + 40] for i in range(0, len(text), 40)]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks + [None]:
+            line = json.dumps({"response": chunk or "", "done": chunk is None}).encode("utf-8") + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            if self.delay:
+                time.sleep(self.delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def start_stub_ollama(delay):
+    StubOllama.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def pick_users():
+    """Teacher of the biggest class, one of its students and that student's parent (+ a messaging peer)."""
+    school_class = (
+        SchoolClass.query
+        .join(User, User.class_id == SchoolClass.id)
+        .filter(SchoolClass.class_teacher_id.isnot(None))
+        .group_by(SchoolClass.id)
+        .order_by(func.count(User.id).desc(), SchoolClass.id)
+        .first()
+    )
+    if school_class is None:
+        sys.exit("No class with a teacher and students: seed the database first (seed_synthetic.py).")
+
+    teacher = db.session.get(User, school_class.class_teacher_id)
+    parent_profile = (
+        ParentProfile.query
+        .join(User, User.email == ParentProfile.child_email)
+        .filter(User.class_id == school_class.id)
+        .order_by(ParentProfile.id)
+        .first()
+    )
+    if parent_profile is None:
+        sys.exit("The biggest class has no parent accounts: seed with --parent-ratio > 0.")
+    student = User.query.filter_by(email=parent_profile.child_email).one()
+
+    peer = (
+        ConversationSummary.query
+        .filter_by(owner_id=teacher.id)
+        .order_by(ConversationSummary.last_message_at.desc())
+        .first()
+    )
+    parent = db.session.get(User, parent_profile.user_id)
+    return school_class, teacher, student, parent, peer.peer_id if peer else student.id
+
+
+def endpoints(school_class, teacher, student, parent, peer_id):
+    """(name, method, path, user, json body) of every benchmarked call."""
+    section = f"grade={school_class.grade}&section={school_class.section}"
+    return [
+        ("class-summary", "get", f"/analytics/class-summary?{section}", teacher, None),
+        ("interventions", "get", f"/interventions?{section}", teacher, None),
+        ("students", "get", f"/students?{section}", teacher, None),
+        ("teacher-stats", "get", "/teacher-stats", teacher, None),
+        ("performance-data", "get", "/performance-data", teacher, None),
+        ("analytics-overview", "get", "/analytics/overview", teacher, None),
+        ("student-profile", "get", f"/student-profile/{student.id}", teacher, None),
+        ("teachers-parents", "get", "/teachers/parents", teacher, None),
+        ("conversations", "get", "/messages/conversations", teacher, None),
+        ("thread", "get", f"/messages/thread/{peer_id}", teacher, None),
+        ("unread-count", "get", "/messages/unread-count", teacher, None),
+        ("parent-progress", "get", "/parent/progress?period=weekly", parent, None),
+        ("parent-reports", "get", "/parent/reports?period=monthly", parent, None),
+        ("parent-recommendations", "get", "/parent/recommendations", parent, None),
+        ("parent-notifications", "get", "/parent/notifications", parent, None),
+        ("student-goals", "get", "/goals", student, None),
+        ("student-activities", "get", "/activities", student, None),
+        ("daily-quiz", "get", "/daily-quiz", student, None),
+        ("custom-quiz", "post", "/custom-quiz", student, {"topic": "Photosynthesis", "difficulty": "medium", "count": 5}),
+    ]
+
+
+def run(args):
+    os.environ["OLLAMA_HOST"] = start_stub_ollama(args.llm_delay)
+    if not args.verbose:
+        # The app logs per request (and background jobs); keep the table readable
+        logging.disable(logging.CRITICAL)
+
+    # Imported only now: the Ollama client reads OLLAMA_HOST at import time
+    from backend.app import app
+
+    bench_thread = threading.get_ident()
+    statements = [0]
+
+    with app.app_context():
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def count_statement(*_):
+            # Background jobs run on other threads and are not charged
+            if threading.get_ident() == bench_thread:
+                statements[0] += 1
+
+        picked = pick_users()
+        school_class, teacher, student, parent, peer_id = picked
+        calls = endpoints(*picked)
+        tokens = {
+            u.id: create_access_token(identity=str(u.id), additional_claims={"role": u.role})
+            for u in (teacher, student, parent)
+        }
+        dialect = db.engine.dialect.name
+        rows = {
+            "users": User.query.count(),
+            "quiz_results": QuizResult.query.count(),
+        }
+        db.session.remove()
+
+    if args.only:
+        calls = [c for c in calls if c[0] in args.only]
+
+    client = app.test_client()
+    results = {}
+    for name, method, path, user, body in calls:
+        headers = {"Authorization": f"Bearer {tokens[user.id]}"}
+        latencies, queries, sizes, statuses = [], [], [], set()
+
+        for i in range(args.warmup + args.iterations):
+            statements[0] = 0
+            started = time.perf_counter()
+            response = getattr(client, method)(path, headers=headers, json=body)
+            elapsed = time.perf_counter() - started
+            if i < args.warmup:
+                continue
+            latencies.append(elapsed)
+            queries.append(statements[0])
+            sizes.append(len(response.get_data()))
+            statuses.add(response.status_code)
+
+        results[name] = {
+            "path": path,
+            "status": sorted(statuses),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+            "max_ms": round(max(latencies) * 1000, 2),
+            "queries": int(statistics.median(queries)),
+            "max_queries": max(queries),
+            "bytes": int(statistics.median(sizes)),
+        }
+        r = results[name]
+        print(f"{name:24} {','.join(map(str, r['status'])):>7} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['max_ms']:>9.1f} {r['queries']:>7} {r['bytes']:>9}")
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "dialect": dialect,
+            "rows": rows,
+            "iterations": args.iterations,
+            "llm_delay": args.llm_delay,
+            "class": f"{school_class.grade}{school_class.section}",
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Lines describing regressions against `baseline`, empty when there are none."""
+    regressions = []
+    for name, now in report["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        if now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {now['p95_ms']} ms")
+        if now["queries"] > before["queries"]:
+            regressions.append(f"{name}: queries {before['queries']} -> {now['queries']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls per endpoint (fill caches)")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="stub Ollama delay per streamed chunk (s)")
+    parser.add_argument("--only", nargs="+", help="benchmark only these endpoint names")
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth vs. the baseline")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's log output")
+    args = parser.parse_args()
+
+    print(f"{'endpoint':24} {'status':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'queries':>7} {'bytes':>9}")
+    report = run(args)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
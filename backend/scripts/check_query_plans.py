@@ -0,0 +1,142 @@
+# backend/scripts/check_query_plans.py
+"""
+EXPLAIN-based regression check for the hot query paths.
+
+Builds the latest-quiz, message-thread, unread-count, section-roster and
+notification queries the way the app does, asks the database for their
+plans and fails when a plan does not go through the index added for it
+(see migration d5f0b8a2c61e). Run it against a seeded database:
+
+    DATABASE_URL=postgresql://... python -m backend.scripts.check_query_plans
+
+Works on PostgreSQL and SQLite. Tables are ANALYZEd first so the planner
+sees the seeded data's real selectivity (e.g. users.role has three
+values), and on PostgreSQL sequential scans are disabled for the session,
+so a small seeded table does not hide a missing index behind a cheaper
+seq scan.
+"""
+import sys
+
+from sqlalchemy import func
+
+from backend import create_app
+from backend.models import db, User, StudentProfile, QuizResult, Message, Notification
+
+
+def _sample(query, what):
+    row = query.first()
+    if row is None:
+        sys.exit(f"No {what} in the database: seed it first.")
+    return row
+
+
+def hot_queries():
+    """(name, expected index, query) for each checked access path."""
+    quiz = _sample(QuizResult.query.order_by(QuizResult.id), "quiz results")
+    message = _sample(Message.query.order_by(Message.id), "messages")
+    profile = _sample(
+        StudentProfile.query.join(User).filter(StudentProfile.grade.isnot(None)),
+        "student profiles"
+    )
+    notification = Notification.query.order_by(Notification.id).first()
+
+    # Same shapes as the routes / services they come from
+    queries = [
+        (
+            "latest quiz",
+            "ix_quiz_results_user_taken_at",
+            QuizResult.query
+            .filter(QuizResult.user_id == quiz.user_id)
+            .order_by(QuizResult.taken_at.desc())
+            .limit(1),
+        ),
+        (
+            "latest quiz per student (section_data)",
+            "ix_quiz_results_user_taken_at",
+            db.session.query(QuizResult.user_id, func.max(QuizResult.taken_at))
+            .filter(QuizResult.user_id.in_([quiz.user_id, quiz.user_id + 1]))
+            .group_by(QuizResult.user_id),
+        ),
+        (
+            "message thread",
+            "ix_message_thread",
+            Message.query
+            .filter(
+                db.or_(
+                    db.and_(Message.sender_id == message.sender_id, Message.receiver_id == message.receiver_id),
+                    db.and_(Message.sender_id == message.receiver_id, Message.receiver_id == message.sender_id),
+                )
+            )
+            .order_by(Message.created_at.asc()),
+        ),
+        (
+            "unread count",
+            "ix_message_receiver_read",
+            db.session.query(func.count(Message.id))
+            .filter(Message.receiver_id == message.receiver_id, Message.read == False),
+        ),
+        (
+            "section roster",
+            "ix_student_profiles_grade_section",
+            User.query
+            .join(StudentProfile)
+            .filter(
+                User.role == "student",
+                User.school_id == profile.user.school_id,
+                StudentProfile.grade == profile.grade,
+                StudentProfile.section == profile.section,
+            )
+            .order_by(User.id),
+        ),
+    ]
+
+    if notification is not None:
+        queries.append((
+            "parent notifications",
+            "ix_notification_user_created_at",
+            Notification.query
+            .filter(Notification.user_id == notification.user_id)
+            .order_by(Notification.created_at.desc())
+            .limit(50),
+        ))
+
+    return queries
+
+
+def explain(query):
+    """The plan of `query` as text lines."""
+    conn = db.session.connection()
+    sql = str(query.statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+
+
+def main():
+    app = create_app()
+    failures = 0
+
+    with app.app_context():
+        db.session.execute(db.text("ANALYZE"))
+        if db.session.connection().dialect.name == "postgresql":
+            db.session.execute(db.text("SET enable_seqscan = off"))
+
+        for name, index, query in hot_queries():
+            plan = explain(query)
+            ok = any(index in line for line in plan)
+            failures += not ok
+
+            print(f"{'ok  ' if ok else 'FAIL'} {name}: expected {index}")
+            if not ok:
+                for line in plan:
+                    print(f"       {line}")
+
+        db.session.rollback()
+
+    if failures:
+        sys.exit(f"{failures} query plan(s) do not use their index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+# backend/scripts/seed_synthetic.py
+"""
+Synthetic multi-school dataset for benchmarks and query-plan checks.
+
+Generates --schools schools, each with one class (and class teacher) per
+grade/section, students with profiles, a parent per student, and for
+every student quiz results (with their topic rows and academic rollups),
+scored chat logs, activities, goals and teacher messages (with the
+conversation summaries), plus assignments per class. The same arguments
+and --seed always produce the same data:
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m backend.scripts.seed_synthetic \\
+        --create-tables --schools 2 --students-per-section 30 --quiz-rows 100000
+
+--quiz-rows sets the total number of quiz results (1k ... 1M) and
+overrides --quizzes-per-student. Rows are written with chunked
+executemany INSERTs, so 1M quiz rows take minutes, not hours. Works on
+SQLite and PostgreSQL; use --create-tables on an empty scratch database
+(otherwise run the migrations first). Every user's password is
+"password123"; emails look like "<prefix>1-teacher-9a@example.com".
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from backend import create_app
+from backend.models import (
+    db, School, SchoolClass, User, StudentProfile, TeacherProfile, ParentProfile,
+    QuizResult, QuizTopicResult, ChatLog, Activity, Goal, Assignment, Message,
+    ConversationSummary,
+)
+from backend.services.chat_analysis import chat_scores
+from backend.services.profile_store import refresh_student_profiles
+from backend.services.rollups import quiz_rollup_deltas, apply_rollup_deltas
+
+PASSWORD = "password123"
+SUBJECTS = ["Math", "Science", "English", "History"]
+ACTIVITY_CATEGORIES = ["sports", "art", "music", "reading", "coding", "science"]
+CITIES = ["Chennai", "Coimbatore", "Madurai", "Bengaluru", "Pune", "Delhi"]
+INTERESTS = ["football", "painting", "robotics", "chess", "dance", "astronomy", "poetry"]
+CHAT_TURNS = [
+    ("Why is the sky blue?", "Sunlight scatters off air molecules, and blue light scatters the most."),
+    ("I don't understand fractions, can you help me?", "Of course! A fraction is a part of a whole."),
+    ("How do plants make food?", "Through photosynthesis, using sunlight, water and carbon dioxide."),
+    ("This homework is too hard, I am confused", "Let's go through it step by step together."),
+    ("What caused World War 1?", "Alliances, militarism, imperialism and nationalism all played a part."),
+    ("Thanks, that was great!", "You're welcome, happy learning!"),
+    ("Can you explain Newton's second law?", "Force equals mass times acceleration: F = ma."),
+    ("I'm bored", "How about a quick quiz on your favourite subject?"),
+]
+TEACHER_LINES = [
+    "Please check this week's assignment.",
+    "Great progress in the last quiz!",
+    "Can we talk about the upcoming test?",
+    "Reminder: project submissions are due Friday.",
+]
+REPLY_LINES = ["Thank you!", "Sure, will do.", "Noted, thanks for letting me know.", "Can we meet on Monday?"]
+
+
+class Writer:
+    """Buffers rows per model and writes each buffer with one executemany."""
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.buffers = defaultdict(list)
+        self.counts = defaultdict(int)
+
+    def add(self, model, row):
+        buffer = self.buffers[model]
+        buffer.append(row)
+        if len(buffer) >= self.chunk_size:
+            self.flush(model)
+
+    def flush(self, model=None):
+        for m in [model] if model else list(self.buffers):
+            rows = self.buffers.pop(m, [])
+            if rows:
+                db.session.execute(insert(m), rows)
+                self.counts[m.__tablename__] += len(rows)
+
+    def insert_returning_ids(self, model, rows):
+        """Ids of `rows`, in order (for rows other rows point to)."""
+        ids = []
+        for i in range(0, len(rows), self.chunk_size):
+            chunk = rows[i:i + self.chunk_size]
+            result = db.session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), chunk)
+            ids.extend(result.scalars())
+        self.counts[model.__tablename__] += len(rows)
+        return ids
+
+
+def _when(rng, now, days):
+    return now - timedelta(seconds=rng.uniform(0, days * 86400))
+
+
+def seed_people(args, rng, writer, now):
+    """Schools, classes, teachers, students and parents. Returns the students as dicts."""
+    password_hash = generate_password_hash(PASSWORD)
+    students = []
+
+    for s in range(1, args.schools + 1):
+        school = School(name=f"{args.prefix.title()} School {s}", unique_code=f"{args.prefix.upper()}-{s:03d}")
+        db.session.add(school)
+        db.session.flush()
+        writer.counts["schools"] += 1
+
+        sections = [(grade, section) for grade in args.grades for section in args.sections]
+        teacher_rows = [
+            {
+                "name": f"Teacher {grade}{section} S{s}",
+                "email": f"{args.prefix}{s}-teacher-{grade}{section.lower()}@example.com",
+                "password_hash": password_hash,
+                "role": "teacher",
+                "school_id": school.id,
+                "is_verified": True,
+                "created_at": now,
+            }
+            for grade, section in sections
+        ]
+        teacher_ids = writer.insert_returning_ids(User, teacher_rows)
+        for teacher_id, (grade, section) in zip(teacher_ids, sections):
+            writer.add(TeacherProfile, {
+                "user_id": teacher_id,
+                "department": rng.choice(SUBJECTS),
+                "designation": "Class Teacher",
+                "experience_years": rng.randint(1, 25),
+                "handling_classes": f"{grade}-{section}",
+            })
+
+        class_ids = writer.insert_returning_ids(SchoolClass, [
+            {
+                "grade": grade,
+                "section": section,
+                "school_id": school.id,
+                "class_teacher_id": teacher_id,
+                "created_at": now,
+            }
+            for teacher_id, (grade, section) in zip(teacher_ids, sections)
+        ])
+
+        for class_id, teacher_id, (grade, section) in zip(class_ids, teacher_ids, sections):
+            for a in range(args.assignments_per_section):
+                writer.add(Assignment, {
+                    "title": f"{rng.choice(SUBJECTS)} worksheet {a + 1}",
+                    "description": "Complete all exercises.",
+                    "grade": grade,
+                    "section": section,
+                    "due_date": (now + timedelta(days=rng.randint(-20, 20))).date(),
+                    "created_by": teacher_id,
+                    "created_at": now,
+                    "is_completed": rng.random() < 0.5,
+                    "school_id": school.id,
+                })
+
+            rows = [
+                {
+                    "name": f"Student {grade}{section}-{n} S{s}",
+                    "email": f"{args.prefix}{s}-student-{grade}{section.lower()}-{n}@example.com",
+                    "password_hash": password_hash,
+                    "role": "student",
+                    "school_id": school.id,
+                    "class_id": class_id,
+                    "is_verified": True,
+                    "created_at": now,
+                }
+                for n in range(1, args.students_per_section + 1)
+            ]
+            for student_id, row in zip(writer.insert_returning_ids(User, rows), rows):
+                writer.add(StudentProfile, {
+                    "user_id": student_id,
+                    "grade": grade,
+                    "section": section,
+                    "age": 5 + int(grade) if grade.isdigit() else 14,
+                    "city": rng.choice(CITIES),
+                    "interests": ", ".join(rng.sample(INTERESTS, 2)),
+                })
+                students.append({
+                    "id": student_id,
+                    "email": row["email"],
+                    "school_id": school.id,
+                    "grade": grade,
+                    "section": section,
+                    "teacher_id": teacher_id,
+                    "ability": rng.betavariate(4, 2),
+                })
+
+    parents = [st for st in students if rng.random() < args.parent_ratio]
+    parent_ids = writer.insert_returning_ids(User, [
+        {
+            "name": f"Parent of {st['email'].split('@')[0]}",
+            "email": st["email"].replace("-student-", "-parent-"),
+            "password_hash": password_hash,
+            "role": "parent",
+            "school_id": st["school_id"],
+            "is_verified": True,
+            "created_at": now,
+        }
+        for st in parents
+    ])
+    for parent_id, st in zip(parent_ids, parents):
+        st["parent_id"] = parent_id
+        writer.add(ParentProfile, {
+            "user_id": parent_id,
+            "child_email": st["email"],
+            "child_password": password_hash,
+        })
+
+    writer.flush()
+    db.session.commit()
+    return students
+
+
+def seed_quizzes(args, rng, writer, students, now):
+    """Quiz results with their topic rows, folded into the rollups chunk by chunk."""
+    pending = []  # (quiz row, summary, student)
+
+    def flush():
+        ids = writer.insert_returning_ids(QuizResult, [row for row, _, _ in pending])
+        deltas = []
+        for quiz_id, (row, summary, st) in zip(ids, pending):
+            for entry in summary:
+                writer.add(QuizTopicResult, {
+                    "quiz_result_id": quiz_id,
+                    "user_id": st["id"],
+                    "school_id": st["school_id"],
+                    "taken_at": row["taken_at"],
+                    **entry,
+                })
+            deltas.extend(quiz_rollup_deltas(
+                st["id"], st["school_id"], st["grade"], st["section"], summary, row["taken_at"]
+            ))
+        writer.flush(QuizTopicResult)
+        apply_rollup_deltas(deltas)
+        db.session.commit()
+        pending.clear()
+
+    per_student, extra = divmod(args.quiz_rows, len(students)) if args.quiz_rows else (args.quizzes_per_student, 0)
+    for i, st in enumerate(students):
+        for _ in range(per_student + (1 if i < extra else 0)):
+            summary = []
+            for subject in rng.sample(SUBJECTS, rng.randint(1, 3)):
+                ability = min(1.0, max(0.0, st["ability"] + rng.uniform(-0.2, 0.2)))
+                summary.append({
+                    "topic": subject,
+                    "correct": sum(rng.random() < ability for _ in range(5)),
+                    "total": 5,
+                })
+            row = {
+                "user_id": st["id"],
+                "summary_data": json.dumps(summary),
+                "taken_at": _when(rng, now, args.days),
+            }
+            pending.append((row, summary, st))
+            if len(pending) >= args.chunk_size:
+                flush()
+    if pending:
+        flush()
+
+
+def seed_activity(args, rng, writer, students, now):
+    """Chat logs, activities, goals and teacher messages."""
+    scores = [chat_scores(user_message, bot_response) for user_message, bot_response in CHAT_TURNS]
+    summaries = {}  # (owner, peer) -> summary row
+
+    for st in students:
+        for _ in range(args.chats_per_student):
+            turn = rng.randrange(len(CHAT_TURNS))
+            writer.add(ChatLog, {
+                "user_id": st["id"],
+                "user_message": CHAT_TURNS[turn][0],
+                "bot_response": CHAT_TURNS[turn][1],
+                "sent_at": _when(rng, now, args.days),
+                **scores[turn],
+            })
+
+        for _ in range(args.activities_per_student):
+            category = rng.choice(ACTIVITY_CATEGORIES)
+            writer.add(Activity, {
+                "title": f"{category.title()} session",
+                "description": f"Time spent on {category}.",
+                "category": category,
+                "time_spent": rng.randint(10, 240),
+                "created_at": _when(rng, now, args.days),
+                "user_id": st["id"],
+            })
+
+        for g in range(args.goals_per_student):
+            status = rng.choices(["completed", "in-progress", "not-started"], weights=[4, 5, 1])[0]
+            writer.add(Goal, {
+                "title": f"{rng.choice(SUBJECTS)} goal {g + 1}",
+                "description": "Improve my scores.",
+                "deadline": now + timedelta(days=rng.randint(-30, 60)),
+                "progress": 100.0 if status == "completed" else float(rng.randint(0, 90)),
+                "status": status,
+                "created_at": _when(rng, now, args.days),
+                "user_id": st["id"],
+            })
+
+        # A thread between the class teacher and the parent (or the student)
+        peer = st.get("parent_id", st["id"])
+        sent_at = now - timedelta(days=args.days)
+        for m in range(args.messages_per_student):
+            sent_at += timedelta(minutes=rng.randint(5, 60 * 24 * 3))
+            sender, receiver = (st["teacher_id"], peer) if m % 2 == 0 else (peer, st["teacher_id"])
+            content = rng.choice(TEACHER_LINES if sender == st["teacher_id"] else REPLY_LINES)
+            read = m < args.messages_per_student - 2
+            writer.add(Message, {
+                "sender_id": sender,
+                "receiver_id": receiver,
+                "content": content,
+                "created_at": sent_at,
+                "read": read,
+            })
+            for owner, other in ((receiver, sender), (sender, receiver)):
+                summary = summaries.setdefault((owner, other), {
+                    "owner_id": owner,
+                    "peer_id": other,
+                    "unread_count": 0,
+                })
+                summary.update(last_message=content, last_sender_id=sender, last_message_at=sent_at, updated_at=now)
+                if owner == receiver and not read:
+                    summary["unread_count"] += 1
+
+    writer.flush()
+    for summary in summaries.values():
+        writer.add(ConversationSummary, summary)
+    writer.flush()
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schools", type=int, default=2)
+    parser.add_argument("--grades", nargs="+", default=["8", "9", "10"])
+    parser.add_argument("--sections", nargs="+", default=["A", "B"])
+    parser.add_argument("--students-per-section", type=int, default=25)
+    parser.add_argument("--parent-ratio", type=float, default=1.0, help="share of students with a parent account")
+    parser.add_argument("--quizzes-per-student", type=int, default=10)
+    parser.add_argument("--quiz-rows", type=int, help="total quiz results (overrides --quizzes-per-student)")
+    parser.add_argument("--chats-per-student", type=int, default=20)
+    parser.add_argument("--activities-per-student", type=int, default=10)
+    parser.add_argument("--goals-per-student", type=int, default=3)
+    parser.add_argument("--messages-per-student", type=int, default=6)
+    parser.add_argument("--assignments-per-section", type=int, default=5)
+    parser.add_argument("--days", type=int, default=120, help="history span of the generated data")
+    parser.add_argument("--prefix", default="bench", help="email / school code prefix of generated rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per INSERT")
+    parser.add_argument("--create-tables", action="store_true", help="db.create_all() first (scratch databases)")
+    parser.add_argument("--skip-snapshots", action="store_true", help="leave student profiles to be built on first use")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.create_tables:
+            db.create_all()
+        if School.query.filter(School.unique_code.like(f"{args.prefix.upper()}-%")).first():
+            sys.exit(f"Schools with prefix {args.prefix!r} already exist: use another --prefix or a fresh database.")
+
+        rng = random.Random(args.seed)
+        writer = Writer(args.chunk_size)
+        now = datetime.utcnow()
+        started = time.monotonic()
+
+        students = seed_people(args, rng, writer, now)
+        if not students:
+            sys.exit("Nothing to seed: no grades, sections or students per section.")
+        print(f"{len(students)} students seeded ({time.monotonic() - started:.1f}s)")
+
+        seed_quizzes(args, rng, writer, students, now)
+        print(f"{writer.counts['quiz_results']} quiz results seeded ({time.monotonic() - started:.1f}s)")
+
+        seed_activity(args, rng, writer, students, now)
+
+        if not args.skip_snapshots:
+            ids = [st["id"] for st in students]
+            for i in range(0, len(ids), 200):
+                refresh_student_profiles(ids[i:i + 200])
+            writer.counts["student_profile_snapshots"] = len(ids)
+
+        print(f"Done in {time.monotonic() - started:.1f}s:")
+        for table, count in sorted(writer.counts.items()):
+            print(f"  {table:28} {count}")
+        print(f"Logins (password {PASSWORD!r}): {args.prefix}1-teacher-{args.grades[0]}{args.sections[0].lower()}@example.com, "
+              f"{students[0]['email']}, {students[0]['email'].replace('-student-', '-parent-')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# backend/scripts/socketio_load_test.py
+"""
+Load test for real-time message delivery across workers.
+
+Starts --workers app processes on consecutive ports, all sharing one
+Socket.IO message queue, connects one Socket.IO client per receiver (spread
+over the workers), then posts messages through /messages/send on randomly
+picked workers and measures how long each `new_message` takes to reach its
+receiver, split by same-worker and cross-worker delivery:
+
+    DATABASE_URL=... python -m backend.scripts.socketio_load_test \\
+        --workers 3 --receivers 30 --messages 600 --rate 50
+
+Without --queue a local broker is started (local:// stand-in, see
+services/realtime.py); pass --queue redis://host:6379/0 to test Redis.
+Messages are really written, so run it against a seeded scratch database.
+Without a queue (--queue none) cross-worker messages are expected to be lost.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+import socketio
+from flask_jwt_extended import create_access_token
+
+from backend import create_app
+from backend.models import User
+from backend.services.realtime import run_local_broker
+
+
+def serve(port):
+    """Worker process: the real app, served by Flask-SocketIO's own server."""
+    from backend.app import app, socketio as server
+    server.run(app, host="127.0.0.1", port=port, allow_unsafe_werkzeug=True, log_output=False)
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def _summary(latencies):
+    return {
+        "delivered": len(latencies),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else None,
+    }
+
+
+def _start_workers(count, base_port, queue):
+    env = dict(os.environ)
+    if queue:
+        env["SOCKETIO_MESSAGE_QUEUE"] = queue
+    else:
+        env.pop("SOCKETIO_MESSAGE_QUEUE", None)
+
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "backend.scripts.socketio_load_test", "--serve", str(base_port + i)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        for i in range(count)
+    ]
+
+    deadline = time.monotonic() + 60
+    for i in range(count):
+        while True:
+            try:
+                requests.get(f"http://127.0.0.1:{base_port + i}/health", timeout=2)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline or workers[i].poll() is not None:
+                    raise SystemExit(f"Worker on port {base_port + i} did not start")
+                time.sleep(0.5)
+    return workers
+
+
+def _tokens(receiver_count):
+    app = create_app()
+    with app.app_context():
+        users = User.query.order_by(User.id).limit(receiver_count + 1).all()
+        if len(users) < receiver_count + 1:
+            raise SystemExit(f"Need {receiver_count + 1} users in the database, found {len(users)}")
+        return [
+            (u.id, create_access_token(identity=str(u.id), additional_claims={"role": u.role}))
+            for u in users
+        ]
+
+
+def run(args):
+    queue = None if args.queue == "none" else args.queue
+    if queue is None and args.queue != "none":
+        run_local_broker(port=args.queue_port, background=True)
+        queue = f"local://127.0.0.1:{args.queue_port}"
+
+    (sender_id, sender_token), *receivers = _tokens(args.receivers)
+    workers = _start_workers(args.workers, args.port, queue)
+    print(f"{args.workers} workers on ports {args.port}-{args.port + args.workers - 1}, queue: {queue or 'none'}")
+
+    lock = threading.Lock()
+    received = {}  # seq -> latency (s)
+    receiver_worker = {}
+    clients = []
+
+    try:
+        for i, (user_id, token) in enumerate(receivers):
+            worker = i % args.workers
+            receiver_worker[user_id] = worker
+            client = socketio.Client(reconnection=False)
+
+            @client.on("new_message")
+            def on_message(payload, user_id=user_id):
+                arrived = time.time()
+                body = json.loads(payload["content"])
+                if payload["receiverId"] == user_id:
+                    with lock:
+                        received.setdefault(body["seq"], arrived - body["sent"])
+
+            client.connect(f"http://127.0.0.1:{args.port + worker}", auth={"token": token}, wait_timeout=10)
+            clients.append(client)
+
+        sent = {}  # seq -> (sender worker, receiver worker)
+        pick_worker = random.Random(0)
+        session = requests.Session()
+        interval = 1.0 / args.rate
+        started = time.monotonic()
+
+        for seq in range(args.messages):
+            receiver_id, _ = receivers[seq % len(receivers)]
+            worker = pick_worker.randrange(args.workers)
+            sent[seq] = (worker, receiver_worker[receiver_id])
+            session.post(
+                f"http://127.0.0.1:{args.port + worker}/messages/send",
+                headers={"Authorization": f"Bearer {sender_token}"},
+                json={
+                    "receiverId": receiver_id,
+                    "content": json.dumps({"seq": seq, "sent": time.time()}),
+                    "createdAt": datetime.utcnow().isoformat() + "Z",
+                },
+                timeout=30,
+            ).raise_for_status()
+            time.sleep(max(0.0, started + (seq + 1) * interval - time.monotonic()))
+
+        deadline = time.monotonic() + args.timeout
+        while len(received) < len(sent) and time.monotonic() < deadline:
+            time.sleep(0.1)
+    finally:
+        for client in clients:
+            client.disconnect()
+        for worker in workers:
+            worker.terminate()
+
+    same = [lat for seq, lat in received.items() if sent[seq][0] == sent[seq][1]]
+    cross = [lat for seq, lat in received.items() if sent[seq][0] != sent[seq][1]]
+    expected_cross = sum(1 for a, b in sent.values() if a != b)
+
+    report = {
+        "sent": len(sent),
+        "delivered": len(received),
+        "same_worker": {**_summary(same), "expected": len(sent) - expected_cross},
+        "cross_worker": {**_summary(cross), "expected": expected_cross},
+        "all": _summary(list(received.values())),
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if len(received) == len(sent) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--receivers", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=20, help="messages per second")
+    parser.add_argument("--port", type=int, default=5100, help="port of the first worker")
+    parser.add_argument("--queue", help="message queue URL, 'none' for no queue (default: local broker)")
+    parser.add_argument("--queue-port", type=int, default=6390)
+    parser.add_argument("--timeout", type=float, default=10, help="seconds to wait for late deliveries")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
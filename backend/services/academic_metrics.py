@@ -1,52 +1,43 @@
 from datetime import datetime, timedelta
-import json
-from collections import defaultdict
-from .quiz_analysis import analyze_quiz
+from sqlalchemy import func
+from backend.models import db, QuizTopicResult
+from .analytics import quiz_totals, quiz_accuracy_expr
 
-def academic_weekly_delta(quiz_results):
+def academic_weekly_deltas(student_ids=None, now=None):
     """
+    Average quiz accuracy of the previous and current week for every
+    student, in one grouped query.
+
     Returns:
-        previous_week_avg, current_week_avg
+        {student_id: (previous_week_avg, current_week_avg)}
     """
 
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
     start_current = now - timedelta(days=7)
     start_previous = now - timedelta(days=14)
 
-    current_scores = []
-    previous_scores = []
-
-    for q in quiz_results:
-        # 1. Parse the data
-        if isinstance(q.summary_data, dict):
-            summary = q.summary_data
-        elif isinstance(q.summary_data, str):
-            summary = json.loads(q.summary_data)
-        else:
-            summary = q.summary_data
-            
-        quiz_values = summary.values() if isinstance(summary, dict) else summary
-
-        try:
-            analysis = analyze_quiz(quiz_values)
-            accuracy = analysis.get("overall_accuracy", 0)
-        except Exception as e:
-            print(f"Error analyzing quiz {q.id}: {e}")
-            continue
-            
-        if q.taken_at >= start_current:
-            current_scores.append(accuracy)
-        elif start_previous <= q.taken_at < start_current:
-            previous_scores.append(accuracy)
-
-    prev_avg = (
-        round(sum(previous_scores) / len(previous_scores), 2)
-        if previous_scores else None
-    )
-
-    curr_avg = (
-        round(sum(current_scores) / len(current_scores), 2)
-        if current_scores else None
+    filters = [QuizTopicResult.taken_at >= start_previous]
+    if student_ids is not None:
+        filters.append(QuizTopicResult.user_id.in_(student_ids))
+
+    totals = quiz_totals(*filters).subquery()
+    accuracy = quiz_accuracy_expr(totals)
+    is_current = totals.c.taken_at >= start_current
+
+    rows = (
+        db.session.query(
+            totals.c.user_id,
+            func.avg(db.case((~is_current, accuracy))),
+            func.avg(db.case((is_current, accuracy))),
+        )
+        .group_by(totals.c.user_id)
+        .all()
     )
 
-    return prev_avg, curr_avg
+    return {
+        user_id: (
+            round(float(prev_avg), 2) if prev_avg is not None else None,
+            round(float(curr_avg), 2) if curr_avg is not None else None,
+        )
+        for user_id, prev_avg, curr_avg in rows
+    }
@@ -3,11 +3,14 @@ from .quiz_analysis import analyze_quiz
 from .chat_analysis import analyze_chat
 from .student_profile import build_dashboard_profile
 
-def build_student_profile(quiz_data, chat_data, student_info=None, activities=None):
+def build_student_profile(quiz_data, chat_data=None, student_info=None, activities=None, chat_insights=None):
     """
     Builds a dashboard-ready student profile.
+    Pass precomputed `chat_insights` (see students_chat_insights) to skip
+    analysing raw `chat_data`.
     """
     quiz_insights = analyze_quiz(quiz_data)
-    chat_insights = analyze_chat(chat_data)
+    if chat_insights is None:
+        chat_insights = analyze_chat(chat_data or [])
     final_profile = build_dashboard_profile(quiz_insights, chat_insights, student_info, activities)
     return final_profile
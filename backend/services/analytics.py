@@ -1,13 +1,13 @@
 from collections import defaultdict
-from .quiz_analysis import analyze_quiz
-import json
-import logging
+from sqlalchemy import case, func
+from backend.models import db, QuizTopicResult, AcademicRollup
+from .rollups import ALL_SUBJECTS, period_label
 
 ACADEMIC_RISK_THRESHOLD = 40
 
 POSITIVE_MOODS = {"Happy", "Focused", "Calm", "Neutral"}
 
-def aggregate_profiles(profiles, quizzes):
+def aggregate_profiles(profiles, weekly_trend):
     total_students = len(profiles)
     if total_students == 0:
         return {
@@ -27,29 +27,6 @@ def aggregate_profiles(profiles, quizzes):
     emotional_counts = defaultdict(int)
     behavior_counts = {"low": 0, "medium": 0, "high": 0}
 
-    # ---------- Weekly Trend ----------
-    weekly_buckets = defaultdict(list)
-    logging.info(quizzes)
-    for q in quizzes:
-        logging.info(q)
-        if not q.summary_data:
-            continue
-
-        quiz_data = json.loads(q.summary_data)
-        analysis = analyze_quiz(quiz_data)
-
-        week = q.taken_at.strftime("Week %U")
-        weekly_buckets[week].append(analysis["overall_accuracy"])
-
-    weekly_trend = [
-        {
-            "week": week,
-            "averageScore": round(sum(scores) / len(scores), 2)
-        }
-        for week, scores in sorted(weekly_buckets.items())
-        if scores
-    ]
-    # logging.info(weekly_trend)
     # ---------- Per Student Aggregation ----------
     for p in profiles:
         # -------- Academic --------
@@ -134,66 +111,122 @@ def compute_quiz_accuracy(quiz_data):
     return round((correct / total) * 100, 2) if total else 0
 
 
+def quiz_totals(*filters):
+    """Per-quiz correct/total sums over quiz_topic_results matching `filters`."""
+    return (
+        db.session.query(
+            QuizTopicResult.quiz_result_id.label("quiz_result_id"),
+            QuizTopicResult.user_id.label("user_id"),
+            QuizTopicResult.taken_at.label("taken_at"),
+            func.sum(QuizTopicResult.correct).label("correct"),
+            func.sum(QuizTopicResult.total).label("total"),
+        )
+        .filter(*filters)
+        .group_by(
+            QuizTopicResult.quiz_result_id,
+            QuizTopicResult.user_id,
+            QuizTopicResult.taken_at
+        )
+    )
+
+
+def quiz_accuracy_expr(totals):
+    """SQL expression for a quiz's accuracy (%) from a quiz_totals() subquery."""
+    return case(
+        (totals.c.total > 0, 100.0 * totals.c.correct / totals.c.total),
+        else_=0
+    )
 
-from collections import defaultdict
 
-def subject_wise_performance(all_quiz_summaries):
-    """
-    all_quiz_summaries: list of quiz summaries
-    [
-        [
-            {"topic": "Math", "correct": 3, "total": 5},
-            {"topic": "Science", "correct": 4, "total": 5}
-        ],
-        ...
-    ]
-    """
+# ---------- Rollup readers ----------
+# `filters` select AcademicRollup rows, e.g. section_scope(school_id) or
+# student_scope(student_id); cost depends on the number of periods, not quizzes.
+
+def average_quiz_accuracy(*filters):
+    """Mean of per-quiz accuracies."""
+    accuracy_sum, quiz_count = (
+        db.session.query(
+            func.sum(AcademicRollup.accuracy_sum),
+            func.sum(AcademicRollup.quiz_count)
+        )
+        .filter(
+            *filters,
+            AcademicRollup.period == "week",
+            AcademicRollup.subject == ALL_SUBJECTS
+        )
+        .one()
+    )
+    return round(accuracy_sum / quiz_count, 2) if quiz_count else 0
 
-    subject_totals = defaultdict(lambda: {"correct": 0, "total": 0})
 
-    for quiz in all_quiz_summaries:
-        for entry in quiz:
-            subject = entry["topic"]
-            subject_totals[subject]["correct"] += entry["correct"]
-            subject_totals[subject]["total"] += entry["total"]
+def subject_wise_performance(*filters):
+    """
+    Accuracy per subject:
+    [{"subject": "Math", "average_score": 72.5}, ...]
+    """
+    rows = (
+        db.session.query(
+            AcademicRollup.subject,
+            func.sum(AcademicRollup.correct),
+            func.sum(AcademicRollup.total)
+        )
+        .filter(
+            *filters,
+            AcademicRollup.period == "week",
+            AcademicRollup.subject != ALL_SUBJECTS
+        )
+        .group_by(AcademicRollup.subject)
+        .all()
+    )
 
     return [
         {
             "subject": subject,
             "average_score": round(
-                (data["correct"] / data["total"]) * 100, 2
-            ) if data["total"] else 0
+                (correct / total) * 100, 2
+            ) if total else 0
         }
-        for subject, data in subject_totals.items()
+        for subject, correct, total in rows
     ]
 
-def weekly_quiz_trend(quiz_results):
-    buckets = defaultdict(list)
-
-    for qr in quiz_results:
-        week = qr.taken_at.strftime("Week %U")
-        accuracy = compute_quiz_accuracy(json.loads(qr.summary_data))
-        buckets[week].append(accuracy)
+def accuracy_trend(period, *filters):
+    """[(period_start, average per-quiz accuracy)] in chronological order."""
+    rows = (
+        db.session.query(
+            AcademicRollup.period_start,
+            func.sum(AcademicRollup.accuracy_sum),
+            func.sum(AcademicRollup.quiz_count)
+        )
+        .filter(
+            *filters,
+            AcademicRollup.period == period,
+            AcademicRollup.subject == ALL_SUBJECTS
+        )
+        .group_by(AcademicRollup.period_start)
+        .order_by(AcademicRollup.period_start)
+        .all()
+    )
+    return [
+        (start, round(accuracy_sum / quiz_count, 2))
+        for start, accuracy_sum, quiz_count in rows
+        if quiz_count
+    ]
 
+def weekly_quiz_trend(*filters):
     return [
         {
-            "week": week,
-            "averageScore": round(sum(scores) / len(scores), 2)
+            "week": period_label(start, "week"),
+            "averageScore": score
         }
-        for week, scores in sorted(buckets.items())
+        for start, score in accuracy_trend("week", *filters)
     ]
 
 NEGATIVE_MOODS = {"Sad", "Angry", "Anxious", "Stressed"}
 
-def compute_student_risk(quiz_results, emotion_logs):
-    if not quiz_results:
+def compute_student_risk(avg_score, emotion_logs=()):
+    if avg_score is None:
         return "high"
 
-    avg_score = sum(
-        compute_quiz_accuracy(json.loads(q.summary_data))
-        for q in quiz_results
-    ) / len(quiz_results)
-
     negative_emotions = sum(
         1 for e in emotion_logs
         if e.mood in NEGATIVE_MOODS
@@ -213,17 +246,32 @@ def compute_student_risk(quiz_results, emotion_logs):
 
     return risk
 
-def risk_distribution(students):
+def risk_distribution(student_ids):
     counts = {"low": 0, "medium": 0, "high": 0}
 
-    for s in students:
-        risk = compute_student_risk(
-            s.quiz_results,
-            s.emotion_logs
+    averages = {
+        user_id: accuracy_sum / quiz_count
+        for user_id, accuracy_sum, quiz_count in (
+            db.session.query(
+                AcademicRollup.user_id,
+                func.sum(AcademicRollup.accuracy_sum),
+                func.sum(AcademicRollup.quiz_count)
+            )
+            .filter(
+                AcademicRollup.user_id.in_(student_ids),
+                AcademicRollup.period == "week",
+                AcademicRollup.subject == ALL_SUBJECTS
+            )
+            .group_by(AcademicRollup.user_id)
         )
+        if quiz_count
+    }
+
+    for student_id in student_ids:
+        risk = compute_student_risk(averages.get(student_id))
         counts[risk] += 1
 
     return [
         {"type": k.capitalize(), "value": v}
         for k, v in counts.items()
-    ]
\ No newline at end of file
+    ]
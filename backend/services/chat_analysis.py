@@ -1,35 +1,160 @@
 # backend/services/chat_analysis.py
-import textblob
+import logging
+
+from sqlalchemy import func
+
+from backend.models import db, ChatLog
+
+SCORE_BATCH_SIZE = 500
+
+
+def message_signals(msg):
+    """
+    Scores a single message.
+    Output: (sentiment polarity, is_curious, is_help_request)
+    """
+    from textblob import TextBlob
+
+    msg_lower = msg.lower()
+
+    # Detect curiosity
+    curious = "why" in msg_lower or "how" in msg_lower or "can you explain" in msg_lower
+
+    # Detect help-seeking
+    help_request = "i don’t understand" in msg_lower or "help" in msg_lower or "confused" in msg_lower
+
+    return TextBlob(msg).sentiment.polarity, curious, help_request
+
+
+def chat_insights(sentiment_sum, message_count, curiosity_level, help_requests):
+    """Dashboard chat insights from summed per-message scores."""
+    avg_sentiment = round(sentiment_sum / message_count, 2) if message_count else 0
+
+    return {
+        "sentiment_score": avg_sentiment,
+        "curiosity_level": int(curiosity_level or 0),
+        "help_requests": int(help_requests or 0)
+    }
+
 
 def analyze_chat(chat_data):
     """
     Input: list of messages (dicts or strings)
     Output: sentiment score, curiosity, help patterns
     """
-    from textblob import TextBlob
-
     help_requests = 0
     curiosity_level = 0
     sentiment_scores = []
 
     for chat in chat_data:
         msg = chat["message"] if isinstance(chat, dict) else chat
-        msg_lower = msg.lower()
+        polarity, curious, help_request = message_signals(msg)
 
-        # Detect curiosity
-        if "why" in msg_lower or "how" in msg_lower or "can you explain" in msg_lower:
-            curiosity_level += 1
+        curiosity_level += curious
+        help_requests += help_request
+        sentiment_scores.append(polarity)
 
-        # Detect help-seeking
-        if "i don’t understand" in msg_lower or "help" in msg_lower or "confused" in msg_lower:
-            help_requests += 1
+    return chat_insights(sum(sentiment_scores), len(sentiment_scores), curiosity_level, help_requests)
 
-        sentiment_scores.append(TextBlob(msg).sentiment.polarity)
 
-    avg_sentiment = round(sum(sentiment_scores) / len(sentiment_scores), 2) if sentiment_scores else 0
+def chat_scores(user_message, bot_response):
+    """The stored score columns of a ChatLog with these two sides."""
+    sentiment_sum = 0.0
+    message_count = curiosity_count = help_count = 0
+
+    for msg in (user_message, bot_response):
+        if not msg:
+            continue
+        polarity, curious, help_request = message_signals(msg)
+        sentiment_sum += polarity
+        message_count += 1
+        curiosity_count += curious
+        help_count += help_request
 
     return {
-        "sentiment_score": avg_sentiment,
-        "curiosity_level": curiosity_level,
-        "help_requests": help_requests
+        "sentiment_sum": sentiment_sum,
+        "message_count": message_count,
+        "curiosity_count": curiosity_count,
+        "help_count": help_count,
+    }
+
+
+def score_chat_log(chat):
+    """
+    Stores the sentiment/curiosity/help scores of both sides of a ChatLog
+    on the row itself, so profiles only have to sum them.
+    """
+    for column, value in chat_scores(chat.user_message, chat.bot_response).items():
+        setattr(chat, column, value)
+    return chat
+
+
+def score_unscored_chat_logs(user_ids=None, batch_size=SCORE_BATCH_SIZE):
+    """
+    Scores chat logs written before scores were stored (or by code paths
+    that skipped scoring). Commits after every batch; returns the number
+    of rows scored.
+    """
+    scored = 0
+    while True:
+        query = ChatLog.query.filter(ChatLog.message_count.is_(None))
+        if user_ids is not None:
+            query = query.filter(ChatLog.user_id.in_(user_ids))
+
+        batch = query.order_by(ChatLog.id).limit(batch_size).all()
+        if not batch:
+            break
+
+        for chat in batch:
+            score_chat_log(chat)
+        db.session.commit()
+        scored += len(batch)
+
+    if scored:
+        logging.info(f"Scored {scored} chat logs")
+    return scored
+
+
+def _chat_score_totals(student_ids):
+    return (
+        db.session.query(
+            ChatLog.user_id,
+            func.coalesce(func.sum(ChatLog.sentiment_sum), 0.0),
+            func.coalesce(func.sum(ChatLog.message_count), 0),
+            func.coalesce(func.sum(ChatLog.curiosity_count), 0),
+            func.coalesce(func.sum(ChatLog.help_count), 0),
+            func.count(ChatLog.id) - func.count(ChatLog.message_count),
+        )
+        .filter(ChatLog.user_id.in_(student_ids))
+        .group_by(ChatLog.user_id)
+        .all()
+    )
+
+
+def students_chat_insights(student_ids):
+    """
+    Chat insights for many students from the stored per-row scores, in one
+    grouped query. Rows that were never scored are scored first.
+
+    Returns {user_id: {"sentiment_score", "curiosity_level", "help_requests"}};
+    students without chats are missing from the dict.
+    """
+    student_ids = list(student_ids)
+    if not student_ids:
+        return {}
+
+    totals = _chat_score_totals(student_ids)
+
+    pending = [row[0] for row in totals if row[5]]
+    if pending:
+        score_unscored_chat_logs(pending)
+        totals = _chat_score_totals(student_ids)
+
+    return {
+        user_id: chat_insights(sentiment_sum, message_count, curiosity, help_requests)
+        for user_id, sentiment_sum, message_count, curiosity, help_requests, _ in totals
     }
+
+
+def student_chat_insights(student_id):
+    return students_chat_insights([student_id]).get(student_id, analyze_chat([]))
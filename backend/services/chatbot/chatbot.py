@@ -1,4 +1,3 @@
-import logging
 from .conversation.llm_interface import LLMInterface
 from .data.storage import Storage
 from .conversation.planner import Planner
@@ -6,9 +5,12 @@ from .conversation.memory import ConversationBufferMemory, SummarizedMemory, Hyb
 
 
 class ChatBot:
-    def __init__(self, user_role: str = "student"):
+    def __init__(self, user_role: str = "student", max_turns: int = 10, max_vectors: int = None, vector_path: str = None):
         """
         user_role: one of ["student", "teacher", "parent"]
+        max_turns: turns kept verbatim in the prompt
+        max_vectors: cap on long-term (vector) memories, None = library default
+        vector_path: optional file prefix to persist the vector memory on disk
         """
         self.llm = LLMInterface()
         self.storage = Storage()
@@ -16,9 +18,9 @@ class ChatBot:
         self.data = self.storage.load()
 
         # --- Memory setup ---
-        self.buffer = ConversationBufferMemory(max_turns=10)
+        self.buffer = ConversationBufferMemory(max_turns=max_turns)
         self.summary = SummarizedMemory()
-        self.vector = VectorMemory(embed_fn=lambda x: [0.1] * 768)  # placeholder embedding fn
+        self.vector = VectorMemory(max_items=max_vectors, path=vector_path)
         self.memory = HybridMemory(self.buffer, self.summary, self.vector)
 
         # --- User role (context switch) ---
@@ -59,8 +61,8 @@ The user is a parent.
 
         return base_prompt + role_prompt
 
-    def chat(self, user_input: str) -> str:
-        """Main chat loop with memory + role-awareness."""
+    def _build_prompt(self, user_input: str) -> str:
+        """Record the user turn and build the full LLM prompt for it."""
         # --- Update memory ---
         self.memory.update("user", user_input)
 
@@ -68,7 +70,7 @@ The user is a parent.
         system_prompt = self._get_system_prompt()
         memory_context = self.memory.get_context(query=user_input)
 
-        final_prompt = f"""{system_prompt}
+        return f"""{system_prompt}
 
 --- Memory Context ---
 {memory_context}
@@ -77,15 +79,35 @@ The user is a parent.
 User: {user_input}
 Assistant:"""
 
+    def chat(self, user_input: str) -> str:
+        """Main chat loop with memory + role-awareness."""
+        final_prompt = self._build_prompt(user_input)
+
         # --- Get LLM response ---
         reply = self.llm.get_reply(final_prompt)
-        logging.info(reply)
 
         # --- Store bot reply in memory ---
         self.memory.update("assistant", reply)
 
         return reply
 
+    def stream_chat(self, user_input: str):
+        """
+        Same as chat() but yields reply chunks as the LLM produces them.
+        The user turn is recorded up front, as in chat(); the full reply is
+        stored once the stream completes, so a stream that fails or is
+        abandoned leaves the user turn without an assistant turn.
+        """
+        final_prompt = self._build_prompt(user_input)
+
+        chunks = []
+        for chunk in self.llm.stream_reply(final_prompt):
+            chunks.append(chunk)
+            yield chunk
+
+        reply = "".join(chunks).strip()
+        self.memory.update("assistant", reply)
+
 
 if __name__ == "__main__":
     bot = ChatBot(user_role="student")
@@ -0,0 +1,36 @@
+"""
+Local text embeddings for VectorMemory.
+---------------------------------------
+
+Hashed term-frequency vectors (word unigrams + bigrams, sublinear tf,
+L2-normalized) computed on CPU with no model download and no fitted state,
+so every worker produces identical vectors for the same text.
+"""
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+EMBED_DIM = 1024
+
+_vectorizer = HashingVectorizer(
+    n_features=EMBED_DIM,
+    ngram_range=(1, 2),
+    alternate_sign=False,
+    norm=None,
+    lowercase=True,
+)
+
+
+def embed_texts(texts) -> np.ndarray:
+    """(len(texts), EMBED_DIM) float32 matrix of unit rows (all-zero rows for empty texts)."""
+    counts = _vectorizer.transform(texts)
+    counts.data = 1.0 + np.log(counts.data)  # sublinear tf
+
+    matrix = counts.toarray().astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def hashed_embedding(text: str) -> np.ndarray:
+    return embed_texts([text])[0]
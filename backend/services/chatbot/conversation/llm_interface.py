@@ -1,86 +1,39 @@
-import requests
-import json
-import os
-from dotenv import load_dotenv
+import logging
 
-# Load environment variables from .env file
-load_dotenv()
+import requests
 
-# The host is now loaded from the .env file
-OLLAMA_HOST = os.getenv("OLLAMA_HOST")
+from backend.services.ollama_client import OLLAMA_HOST, OllamaClient, get_ollama_client
 
 class LLMInterface:
     def __init__(self, ollama_model="llama3", host=OLLAMA_HOST):
         # We use the host loaded from the environment
         self.model = ollama_model
         self.host = host
+        # Pooled keep-alive connections shared by every LLMInterface in the process
+        self.client = get_ollama_client() if host == OLLAMA_HOST else OllamaClient(host=host)
 
     def get_reply(self, prompt: str) -> str:
-        """Send prompt to Ollama via the ngrok tunnel and stream response."""
+        """Send prompt to Ollama via the ngrok tunnel and collect the streamed response."""
         
         if not self.host:
             print("❌ OLLAMA_HOST not set in .env file. Cannot connect.")
             return "Connection error."
         
         try:
-            api_endpoint = f"{self.host}/api/generate"
-            print(f"Connecting to: {api_endpoint}")
-            
-            # --- FIX: Explicitly include "stream": true in the JSON payload ---
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": True  # Crucial for chunked responses
-            }
-            
-            response = requests.post(
-                api_endpoint,
-                json=payload,
-                stream=True,
-                # (Connect timeout, Read timeout)
-                # 10s to connect, 300s (5 mins) wait between chunks
-                timeout=(10, 300) 
-            )
-
-            response.raise_for_status() # Raises an HTTPError for bad responses (4xx or 5xx)
-            
-            full_reply = ""
-            print("AI Response:")
-            
-            # Stream the response chunk by chunk
-            for line in response.iter_lines():
-                if not line:
-                    continue
-                
-                # Check for line content before decoding
-                try:
-                    data = json.loads(line.decode("utf-8"))
-                except json.JSONDecodeError:
-                    print(f"\n❌ JSON Decode Error on line: {line.decode('utf-8')}")
-                    continue
+            return self.client.generate(prompt, model=self.model)
 
-                # Check for an explicit error message from Ollama itself
-                if data.get("error"):
-                    raise Exception(data["error"])
-                    
-                if "response" in data:
-                    # Print the response chunk to see the stream in real-time
-                    print(data["response"], end="", flush=True) 
-                    full_reply += data["response"]
-                
-                if data.get("done"):
-                    break
-
-            return full_reply.strip()
-            
         except requests.exceptions.HTTPError as e:
-            print(f"\n❌ HTTP Error {response.status_code}: Could not reach or process request at the Ollama server.")
-            print(f"Server response details: {response.text}")
+            logging.error(f"❌ HTTP Error {e.response.status_code}: Could not reach or process request at the Ollama server.")
+            logging.error(f"Server response details: {e.response.text}")
             return None
         except Exception as e:
-            print(f"\n❌ Ollama failed: {e}")
+            logging.error(f"❌ Ollama failed: {e}")
             return None
 
+    def stream_reply(self, prompt: str):
+        """Yield the reply chunk by chunk as Ollama streams it. Errors propagate."""
+        yield from self.client.stream(prompt, model=self.model)
+
 if __name__ == "__main__":
     # --- Test Execution ---
     
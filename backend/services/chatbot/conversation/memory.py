@@ -10,9 +10,33 @@ Provides:
 """
 
 import json
-import requests
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
+
+from backend.services.ollama_client import get_ollama_client
+from .embeddings import EMBED_DIM, hashed_embedding
+
+DEFAULT_VECTOR_CAPACITY = 1000
+SUMMARY_EVERY_TURNS = 10
+SUMMARY_TIMEOUT = float(os.getenv("CHAT_SUMMARY_TIMEOUT", 60))
+
+# Shared by every session: summaries never run in the request thread
+_summary_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHAT_SUMMARY_WORKERS", 2)),
+    thread_name_prefix="chat-summary",
+)
+
 
 class ConversationBufferMemory:
     """Simple rolling chat history memory."""
@@ -32,32 +56,75 @@ class ConversationBufferMemory:
 
 
 class SummarizedMemory:
-    """Keeps a short summary instead of full history."""
+    """
+    Keeps a short summary instead of full history.
+
+    Every SUMMARY_EVERY_TURNS turns the summary is refreshed on a background
+    worker while the conversation goes on with the previous one. At most one
+    summarization per memory is in flight: turns arriving meanwhile only
+    replace the history it will summarize next.
+    """
 
-    def __init__(self, model: str = "llama3", api_url: str = "http://localhost:11434/api/generate"):
+    def __init__(self, model: str = "llama3", client=None, timeout: float = SUMMARY_TIMEOUT):
         self.summary = "The conversation just started."
         self.model = model
-        self.api_url = api_url
+        self.client = client or get_ollama_client()
+        self.timeout = timeout
         self.turn_count = 0
 
-    def _summarize(self, history: str) -> str:
-        """Use Ollama to summarize conversation internally."""
-        payload = {
-            "model": self.model,
-            "prompt": f"Summarize this conversation briefly:\n{history}"
-        }
-        response = requests.post(self.api_url, json=payload, stream=True)
-        result = ""
-        for line in response.iter_lines():
-            if line:
-                data = json.loads(line)
-                result += data.get("response", "")
-        return result.strip()
+        self._lock = threading.Lock()
+        self._pending_history = None
+        self._running = False
+
+    def _summarize(self, history: str) -> Optional[str]:
+        """Use Ollama to summarize conversation internally. None if it took longer than `timeout`."""
+        started = time.monotonic()
+        chunks = []
+        stream = self.client.stream(
+            f"Summarize this conversation briefly:\n{history}",
+            model=self.model,
+            timeout=(self.client.timeout[0], self.timeout),
+        )
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                if time.monotonic() - started > self.timeout:
+                    logging.warning(f"Conversation summary timed out after {self.timeout}s")
+                    return None
+        finally:
+            stream.close()
+        return "".join(chunks).strip()
+
+    def _summarize_pending(self):
+        """Worker loop: summarizes the latest pending history until none is left."""
+        while True:
+            with self._lock:
+                history, self._pending_history = self._pending_history, None
+                if history is None:
+                    self._running = False
+                    return
+
+            try:
+                summary = self._summarize(history)
+            except Exception as e:
+                logging.error(f"Conversation summary failed: {e}")
+                summary = None
+
+            if summary:
+                self.summary = summary
 
     def update(self, history: str):
         self.turn_count += 1
-        if self.turn_count % 10 == 0:  # summarize every 10 turns
-            self.summary = self._summarize(history)
+        if self.turn_count % SUMMARY_EVERY_TURNS != 0:
+            return
+
+        with self._lock:
+            self._pending_history = history
+            if self._running:
+                return  # the running worker picks it up next
+            self._running = True
+
+        _summary_executor.submit(self._summarize_pending)
 
     def get_context(self) -> str:
         """Return summary for LLM prompt (not shown to user)."""
@@ -65,31 +132,140 @@ class SummarizedMemory:
 
 
 class VectorMemory:
-    """Long-term semantic memory using embeddings."""
+    """
+    Long-term semantic memory using embeddings.
 
-    def __init__(self, embed_fn):
+    Embeddings live in one contiguous float32 matrix of unit-length rows,
+    used as a ring buffer of `max_items` slots: once full, a new memory
+    overwrites the oldest one. Search is a single matrix-vector product
+    followed by argpartition.
+
+    With `path`, the matrix is a NumPy memmap at `<path>.f32` and the texts
+    are kept in `<path>.json`, so the memory survives restarts. The files
+    belong to one process at a time (an exclusive lock on `<path>.lock`);
+    another gunicorn worker opening the same conversation meanwhile keeps
+    its copy in memory only.
+    """
+
+    def __init__(
+        self,
+        embed_fn=hashed_embedding,
+        max_items: Optional[int] = None,
+        dim: int = EMBED_DIM,
+        path: Optional[str] = None,
+    ):
         """
-        embed_fn: function(text) -> List[float]
-        Example: sentence-transformers or OpenAI embeddings.
+        embed_fn: function(text) -> vector of length `dim`
+        max_items: keep at most this many memories (oldest dropped first).
+        path: optional file prefix for on-disk persistence.
         """
         self.embed_fn = embed_fn
-        self.vectors: List[Dict] = []
+        self.max_items = max_items or DEFAULT_VECTOR_CAPACITY
+        self.dim = dim
+        self.path = path
+
+        self._texts: List[Optional[str]] = [None] * self.max_items
+        self._metadata: List[dict] = [{} for _ in range(self.max_items)]
+        self._size = 0
+        self._next = 0
+        self._lock_fd = None
+
+        if path and self._lock_files():
+            self._matrix = self._open_memmap()
+        else:
+            self.path = None
+            self._matrix = np.zeros((self.max_items, dim), dtype=np.float32)
+
+    def __del__(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # releases the lock
+
+    def __len__(self):
+        return self._size
+
+    def _lock_files(self) -> bool:
+        """Takes the process-exclusive lock on the files; False when another process holds it."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if fcntl is None:
+            return True
+
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            logging.info(f"Vector memory {self.path} is in use by another process; keeping it in memory")
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _open_memmap(self):
+        matrix_file = f"{self.path}.f32"
+        state_file = f"{self.path}.json"
+        expected_bytes = self.max_items * self.dim * 4
+
+        if os.path.exists(matrix_file) and os.path.getsize(matrix_file) == expected_bytes and os.path.exists(state_file):
+            try:
+                with open(state_file, "r") as f:
+                    state = json.load(f)
+                self._texts = state["texts"]
+                self._metadata = state["metadata"]
+                self._size = state["size"]
+                self._next = state["next"]
+                return np.memmap(matrix_file, dtype=np.float32, mode="r+", shape=(self.max_items, self.dim))
+            except (ValueError, KeyError) as e:
+                logging.warning(f"Discarding unreadable vector memory {self.path}: {e}")
+
+        # Missing, resized or corrupt: start over
+        return np.memmap(matrix_file, dtype=np.float32, mode="w+", shape=(self.max_items, self.dim))
+
+    def _persist(self):
+        self._matrix.flush()
+        state_file = f"{self.path}.json"
+        tmp_file = f"{state_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({
+                "texts": self._texts,
+                "metadata": self._metadata,
+                "size": self._size,
+                "next": self._next,
+            }, f)
+        os.replace(tmp_file, state_file)
 
     def add(self, text: str, metadata: Optional[dict] = None):
-        embedding = self.embed_fn(text)
-        self.vectors.append({"embedding": embedding, "text": text, "metadata": metadata or {}})
+        embedding = np.asarray(self.embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+
+        slot = self._next
+        self._matrix[slot] = embedding
+        self._texts[slot] = text
+        self._metadata[slot] = metadata or {}
+
+        self._next = (slot + 1) % self.max_items
+        self._size = min(self._size + 1, self.max_items)
+
+        if self.path:
+            self._persist()
 
     def search(self, query: str, top_k: int = 3) -> List[str]:
-        """Return top-k relevant memories by cosine similarity."""
-        import numpy as np
+        """Return top-k relevant memories by cosine similarity (unrelated ones are left out)."""
+        if not self._size or top_k <= 0:
+            return []
+
+        query_vec = np.asarray(self.embed_fn(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vec)
+        if norm == 0:
+            return []
+        query_vec /= norm
 
-        def cosine(a, b):
-            return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+        scores = self._matrix[: self._size] @ query_vec
 
-        query_vec = self.embed_fn(query)
-        scored = [(cosine(query_vec, v["embedding"]), v["text"]) for v in self.vectors]
-        scored.sort(reverse=True, key=lambda x: x[0])
-        return [t for _, t in scored[:top_k]]
+        k = min(top_k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self._texts[i] for i in top if scores[i] > 0]
 
 
 class HybridMemory:
@@ -108,6 +284,12 @@ class HybridMemory:
         if role == "user":  # store only user queries in vector DB
             self.vector.add(content)
 
+    def restore(self, role: str, content: str, vector: bool = True):
+        """Replay a stored turn into buffer/vector memory without triggering a summary."""
+        self.buffer.add(role, content)
+        if vector and role == "user":
+            self.vector.add(content)
+
     def get_context(self, query: str = "") -> str:
         """Return combined memory context for LLM prompts (not shown to user)."""
         context = [
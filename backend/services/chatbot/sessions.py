@@ -0,0 +1,118 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from backend.models import ChatLog
+from .chatbot import ChatBot
+
+
+class ChatSession:
+    """One user's conversation: its own ChatBot (and memories) plus a lock
+    so concurrent requests from the same user take turns."""
+
+    def __init__(self, bot: ChatBot):
+        self.bot = bot
+        self.lock = threading.Lock()
+
+    def chat(self, user_input: str) -> str:
+        with self.lock:
+            return self.bot.chat(user_input)
+
+    def stream_chat(self, user_input: str):
+        """Streams one turn; the session stays locked until the stream is done or closed."""
+        with self.lock:
+            yield from self.bot.stream_chat(user_input)
+
+
+class ChatSessionManager:
+    """
+    Keeps one ChatSession per (user, role, conversation) in an LRU of at most
+    `max_sessions` entries. A session that is created (first message, after
+    eviction or after a worker restart) is rehydrated from the user's latest
+    ChatLog rows, so the conversation picks up where it left off.
+    """
+
+    def __init__(self, max_sessions: int = 500, max_turns: int = 10, max_vectors: int = 200, vector_dir: str = None):
+        """
+        vector_dir: when set, each session's vector memory is memory-mapped
+        from a file in this directory and survives restarts. Only one
+        worker process at a time uses a given file (see VectorMemory).
+        """
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.max_vectors = max_vectors
+        self.vector_dir = vector_dir
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, user_id: int, user_role: str = "student", conversation_id=None) -> ChatSession:
+        key = (user_id, user_role, conversation_id)
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+
+        # Built outside the lock: rehydration hits the database
+        session = self._create(user_id, user_role, conversation_id)
+
+        with self._lock:
+            # Another request may have created it meanwhile; keep the first one
+            session = self._sessions.setdefault(key, session)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                logging.info(f"Evicted chat session {evicted}")
+            return session
+
+    def drop(self, user_id: int):
+        """Forget every session of a user (e.g. on logout or account deletion)."""
+        with self._lock:
+            for key in [k for k in self._sessions if k[0] == user_id]:
+                del self._sessions[key]
+
+    def _vector_path(self, user_id: int, user_role: str, conversation_id):
+        if not self.vector_dir:
+            return None
+        name = f"user-{user_id}-{user_role}"
+        if conversation_id is not None:
+            name += "-" + re.sub(r"[^A-Za-z0-9_-]", "_", str(conversation_id))[:64]
+        return os.path.join(self.vector_dir, name)
+
+    def _create(self, user_id: int, user_role: str, conversation_id=None) -> ChatSession:
+        bot = ChatBot(
+            user_role=user_role,
+            max_turns=self.max_turns,
+            max_vectors=self.max_vectors,
+            vector_path=self._vector_path(user_id, user_role, conversation_id),
+        )
+        # A vector memory loaded from disk already holds these turns
+        restore_vectors = len(bot.vector) == 0
+        for role, content in self._history(user_id):
+            bot.memory.restore(role, content, vector=restore_vectors)
+        return ChatSession(bot)
+
+    def _history(self, user_id: int):
+        """Latest stored turns of the user, oldest first, as (role, content)."""
+        rows = (
+            ChatLog.query
+            .with_entities(ChatLog.user_message, ChatLog.bot_response)
+            .filter(ChatLog.user_id == user_id)
+            .order_by(ChatLog.id.desc())
+            .limit(self.max_turns * 2)
+            .all()
+        )
+
+        history = []
+        for user_message, bot_response in reversed(rows):
+            if user_message:
+                history.append(("user", user_message))
+            if bot_response:
+                history.append(("assistant", bot_response))
+        return history[-self.max_turns * 2 :]
@@ -0,0 +1,124 @@
+# backend/services/conversations.py
+import base64
+from datetime import datetime, timezone
+
+from backend.models import db, User, Message, ConversationSummary
+from backend.utils.db import upsert_add
+
+THREAD_PAGE_SIZE = 50
+THREAD_MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(message):
+    """Opaque cursor pointing just before `message` in its thread."""
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """(created_at, id) of an encode_cursor value. Raises ValueError when malformed."""
+    try:
+        created_at, message_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def parse_iso_timestamp(value):
+    """
+    Naive UTC datetime of a client ISO timestamp ("...Z" or with an offset).
+    Raises ValueError when it is not one.
+    """
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_client_timestamp(value):
+    """parse_iso_timestamp, or now when the value is missing or unparseable."""
+    try:
+        return parse_iso_timestamp(value)
+    except ValueError:
+        return datetime.utcnow()
+
+
+def thread_page(user_id, other_user_id, limit=THREAD_PAGE_SIZE, before=None):
+    """
+    One page of the thread between two users: the `limit` newest messages
+    older than `before` (a decoded cursor), oldest first, plus the cursor
+    of the next (older) page or None when this page reaches the start.
+
+    Keyset pagination on (created_at, id), walked through ix_message_thread,
+    so every page costs the same however long the thread is.
+    """
+    user_id, other_user_id = int(user_id), int(other_user_id)
+
+    query = Message.query.filter(
+        db.or_(
+            db.and_(Message.sender_id == user_id, Message.receiver_id == other_user_id),
+            db.and_(Message.sender_id == other_user_id, Message.receiver_id == user_id),
+        )
+    )
+    if before is not None:
+        created_at, message_id = before
+        query = query.filter(
+            db.or_(
+                Message.created_at < created_at,
+                db.and_(Message.created_at == created_at, Message.id < message_id),
+            )
+        )
+
+    rows = (
+        query
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return list(reversed(rows[:limit])), next_cursor
+
+
+def record_message(message):
+    """
+    Updates both participants' conversation summaries for a new, flushed
+    message: last message for both, +1 unread for the receiver. Caller commits.
+    """
+    summary = {
+        "last_message": message.content,
+        "last_sender_id": message.sender_id,
+        "last_message_at": message.created_at,
+        "updated_at": datetime.utcnow(),
+    }
+    sender_id, receiver_id = int(message.sender_id), int(message.receiver_id)
+
+    rows = [{**summary, "owner_id": receiver_id, "peer_id": sender_id, "unread_count": 1}]
+    if sender_id != receiver_id:
+        rows.append({**summary, "owner_id": sender_id, "peer_id": receiver_id, "unread_count": 0})
+
+    upsert_add(
+        ConversationSummary,
+        rows,
+        key_columns=("owner_id", "peer_id"),
+        sum_columns=("unread_count",),
+        replace_columns=("last_message", "last_sender_id", "last_message_at", "updated_at"),
+    )
+
+
+def mark_conversation_read(owner_id, peer_id):
+    """Resets the owner's unread count for `peer`. Caller commits."""
+    ConversationSummary.query.filter_by(
+        owner_id=int(owner_id), peer_id=int(peer_id)
+    ).update({"unread_count": 0})
+
+
+def inbox(user_id):
+    """The user's conversations, most recent first, as (ConversationSummary, peer name)."""
+    return (
+        db.session.query(ConversationSummary, User.name)
+        .join(User, User.id == ConversationSummary.peer_id)
+        .filter(ConversationSummary.owner_id == int(user_id))
+        .order_by(ConversationSummary.last_message_at.desc())
+        .all()
+    )
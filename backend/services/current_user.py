@@ -0,0 +1,69 @@
+# backend/services/current_user.py
+import threading
+import time
+
+from sqlalchemy.orm import joinedload
+
+from backend.models import db, User, ParentProfile
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _query_user(user_id):
+    """The user with role profile, school and (parents) linked child + its profile, in one query."""
+    return (
+        User.query
+        .options(
+            joinedload(User.student_profile),
+            joinedload(User.teacher_profile),
+            joinedload(User.admin_profile),
+            joinedload(User.school),
+            joinedload(User.parent_profile)
+            .joinedload(ParentProfile.child)
+            .joinedload(User.student_profile),
+        )
+        .filter(User.id == user_id)
+        .first()
+    )
+
+
+def load_current_user(user_id, ttl=0):
+    """
+    Loads the authenticated user for flask_jwt_extended's user lookup, which
+    runs once per request and keeps the result for the rest of it
+    (`current_user`).
+
+    With `ttl` > 0 the loaded graph is also kept per process for that many
+    seconds and merged into the request's session without querying.
+    Changes to a user are then visible to other workers only after the TTL.
+    """
+    user_id = int(user_id)
+    if ttl <= 0:
+        return _query_user(user_id)
+
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(user_id)
+
+    if cached is not None and cached[0] > now:
+        return db.session.merge(cached[1], load=False)
+
+    user = _query_user(user_id)
+    if user is None:
+        return None
+
+    # Touch the lazily-unloadable parts so the detached copy is complete
+    if user.parent_profile is not None:
+        user.parent_profile.child
+
+    db.session.expunge(user)
+    with _cache_lock:
+        _cache[user_id] = (now + ttl, user)
+    return db.session.merge(user, load=False)
+
+
+def forget_current_user(user_id):
+    """Drops a cached user after it (or its profiles) changed."""
+    with _cache_lock:
+        _cache.pop(int(user_id), None)
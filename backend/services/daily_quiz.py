@@ -0,0 +1,168 @@
+# backend/services/daily_quiz.py
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from backend.models import db, DailyQuiz
+from backend.utils.db import insert_ignore
+from .jobs import submit_job
+from .quiz_generator import FALLBACK_QUESTIONS, QUIZ_TIMEOUT, generate_quiz_with_ai
+
+DAILY_SUBJECTS = ["Math", "Science", "English", "History"]
+DAILY_QUIZ_KEEP_DAYS = int(os.getenv("DAILY_QUIZ_KEEP_DAYS", 7))
+# gunicorn worker timeout (--timeout in the Procfile): a request must answer well within it
+WEB_TIMEOUT = float(os.getenv("WEB_TIMEOUT", 30))
+# How long a request waits for the day's quiz before serving the fallback questions
+DAILY_QUIZ_WAIT = float(os.getenv("DAILY_QUIZ_WAIT", min(5.0, WEB_TIMEOUT / 6)))
+# How long a "generating" claim is trusted before another worker takes over. The
+# generation runs in a background job, bounded by the Ollama timeouts, not the worker's
+DAILY_QUIZ_CLAIM_TIMEOUT = float(os.getenv("DAILY_QUIZ_CLAIM_TIMEOUT", sum(QUIZ_TIMEOUT) + 30))
+# A failed generation is retried (by whichever worker asks first) after this long
+DAILY_QUIZ_RETRY_SECONDS = float(os.getenv("DAILY_QUIZ_RETRY_SECONDS", 60))
+DAILY_QUIZ_POLL_INTERVAL = 0.5
+
+_lock = threading.Lock()
+_today = {}  # {date: quiz}, only the current day
+
+
+def _generate(subjects):
+    """
+    One quiz per subject, all Ollama calls in flight at once. Raises if
+    any subject fails: a partial or fallback quiz must not be stored.
+    """
+    with ThreadPoolExecutor(max_workers=len(subjects)) as pool:
+        quizzes = pool.map(lambda subject: generate_quiz_with_ai(subject=subject, count=5, strict=True), subjects)
+        return dict(zip(subjects, quizzes))
+
+
+def _fallback():
+    return {subject: FALLBACK_QUESTIONS.get(subject, []) for subject in DAILY_SUBJECTS}
+
+
+def _read(day):
+    """(status, quiz_data, claimed_at) of the stored row, read on a fresh connection."""
+    table = DailyQuiz.__table__
+    with db.engine.connect() as conn:
+        return conn.execute(
+            db.select(table.c.status, table.c.quiz_data, table.c.claimed_at)
+            .where(table.c.quiz_date == day)
+        ).first()
+
+
+def _claim(day):
+    """True when this worker won the right to generate `day`'s quiz."""
+    now = datetime.utcnow()
+    try:
+        result = db.session.execute(
+            insert_ignore(DailyQuiz).values(quiz_date=day, status="generating", claimed_at=now, created_at=now)
+        )
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    if result.rowcount == 1:
+        return True
+
+    # Someone else claimed it; take over only if their claim went stale or failed a while ago
+    result = DailyQuiz.query.filter(
+        DailyQuiz.quiz_date == day,
+        db.or_(
+            db.and_(
+                DailyQuiz.status == "generating",
+                DailyQuiz.claimed_at < now - timedelta(seconds=DAILY_QUIZ_CLAIM_TIMEOUT),
+            ),
+            db.and_(
+                DailyQuiz.status == "failed",
+                DailyQuiz.claimed_at < now - timedelta(seconds=DAILY_QUIZ_RETRY_SECONDS),
+            ),
+        ),
+    ).update({"status": "generating", "claimed_at": now}, synchronize_session=False)
+    db.session.commit()
+    return result == 1
+
+
+def _store(day, quiz):
+    DailyQuiz.query.filter_by(quiz_date=day).update(
+        {"status": "ready", "quiz_data": json.dumps(quiz)}, synchronize_session=False
+    )
+    # Old days are never served again
+    DailyQuiz.query.filter(
+        DailyQuiz.quiz_date < day - timedelta(days=DAILY_QUIZ_KEEP_DAYS)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def _mark_failed(day):
+    DailyQuiz.query.filter_by(quiz_date=day, status="generating").update(
+        {"status": "failed", "claimed_at": datetime.utcnow()}, synchronize_session=False
+    )
+    db.session.commit()
+
+
+def build_daily_quiz(day):
+    """
+    Background job of the worker holding `day`'s claim: generates and
+    stores the quiz. A failure is recorded on the row, so that no fallback
+    is ever stored and any worker retries after DAILY_QUIZ_RETRY_SECONDS.
+    """
+    try:
+        quiz = _generate(DAILY_SUBJECTS)
+    except Exception as e:
+        logging.error(f"Daily quiz for {day} could not be generated: {e}")
+        db.session.rollback()
+        _mark_failed(day)
+        return
+    _store(day, quiz)
+
+
+def _wait_for(day):
+    """
+    The stored quiz of `day`, polling while it is being generated for at
+    most DAILY_QUIZ_WAIT seconds. None if it is not ready by then.
+    """
+    deadline = time.monotonic() + DAILY_QUIZ_WAIT
+
+    while True:
+        row = _read(day)
+        if row is not None and row.status == "ready":
+            return json.loads(row.quiz_data)
+        if row is None or row.status != "generating" or time.monotonic() > deadline:
+            return None
+        time.sleep(DAILY_QUIZ_POLL_INTERVAL)
+
+
+def generate_daily_quiz():
+    """
+    Today's quiz ({subject: [question, ...]}), identical on every worker.
+
+    Generated at most once per day cluster-wide, never in a request: the
+    first worker to claim the day's daily_quizzes row queues a background
+    job generating the four subjects in parallel. Requests wait a few
+    seconds (DAILY_QUIZ_WAIT, well within the worker timeout) for the row
+    to become ready and serve the fallback questions meanwhile; those are
+    never stored or kept. The ready quiz is then kept in memory.
+    """
+    today = date.today()
+    quiz = _today.get(today)
+    if quiz is not None:
+        return quiz
+
+    row = _read(today)
+    if (row is None or row.status != "ready") and _claim(today):
+        submit_job(build_daily_quiz, today, job_id=f"daily-quiz-{today}")
+
+    quiz = _wait_for(today)
+    if quiz is None:
+        logging.warning(f"Daily quiz for {today} not ready yet; serving fallback questions")
+        return _fallback()
+
+    with _lock:
+        _today.clear()
+        _today[today] = quiz
+    return quiz
@@ -0,0 +1,46 @@
+# backend/services/forecast_model.py
+#
+# Runs inside the forecast process pool (see forecasts.py): keep imports
+# light, nothing from Flask or the database.
+
+
+def fit_weekly_forecast(points, horizon):
+    """
+    Fits Prophet on a weekly accuracy series and predicts `horizon` more weeks.
+    points: [("YYYY-MM-DD", score)] in chronological order.
+    Returns [{"ds": "YYYY-MM-DD", "yhat": ..., "yhat_lower": ..., "yhat_upper": ...}].
+    """
+    import logging
+
+    import pandas as pd
+    from prophet import Prophet
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+    history = pd.DataFrame(points, columns=["ds", "y"])
+    history["ds"] = pd.to_datetime(history["ds"])
+
+    model = Prophet(
+        growth="linear",
+        yearly_seasonality=False,
+        weekly_seasonality=False,
+        daily_seasonality=False,
+        interval_width=0.8,
+    )
+    model.fit(history)
+
+    future = model.make_future_dataframe(periods=horizon, freq="W-SUN", include_history=False)
+    forecast = model.predict(future)
+
+    def clip(value):
+        return round(min(max(float(value), 0.0), 100.0), 2)
+
+    return [
+        {
+            "ds": row.ds.strftime("%Y-%m-%d"),
+            "yhat": clip(row.yhat),
+            "yhat_lower": clip(row.yhat_lower),
+            "yhat_upper": clip(row.yhat_upper),
+        }
+        for row in forecast.itertuples()
+    ]
@@ -0,0 +1,149 @@
+# backend/services/forecasts.py
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from datetime import datetime, timedelta
+
+from backend.models import db, ForecastCache
+from .analytics import accuracy_trend
+from .forecast_model import fit_weekly_forecast
+from backend.utils.db import upsert_add
+from .jobs import submit_job
+from .rollups import period_label
+
+FORECAST_HORIZON_WEEKS = 4
+FORECAST_MIN_POINTS = 3
+FORECAST_FIT_TIMEOUT = float(os.getenv("FORECAST_FIT_TIMEOUT", 120))
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", 1))
+# A series whose fit failed is not refitted before this (unless it changes)
+FORECAST_RETRY_HOURS = float(os.getenv("FORECAST_RETRY_HOURS", 6))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _forecast_pool():
+    """
+    Process pool for Prophet fits, created on first use. Fits are CPU-bound
+    and hold the GIL, so they run in separate (spawned, not forked)
+    processes rather than in the web worker's threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = multiprocessing.get_context("spawn").Pool(processes=FORECAST_WORKERS)
+        return _pool
+
+
+def _discard_pool(pool):
+    """
+    Kills the workers of `pool` and forgets it, so the next fit starts a
+    fresh pool. A fit that timed out would otherwise keep its worker busy.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.terminate()
+
+
+def series_fingerprint(points):
+    """Identifies a weekly series: any new quiz in the scope changes it."""
+    payload = json.dumps(points, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compute_forecast(scope_key, points, fingerprint):
+    """
+    Background job: fits the series in the process pool and caches the
+    result. A fit that raises or times out is cached as "failed" for this
+    fingerprint (keeping the previous forecast) so requests stop queueing it.
+    """
+    pool = _forecast_pool()
+    try:
+        forecast = pool.apply_async(
+            fit_weekly_forecast, (points, FORECAST_HORIZON_WEEKS)
+        ).get(timeout=FORECAST_FIT_TIMEOUT)
+    except Exception as e:
+        if _pool is not pool:
+            # Another fit's timeout tore the pool down under this one: not this series' fault
+            logging.error(f"Forecast for {scope_key} lost its worker: {e!r}")
+            return
+        if isinstance(e, multiprocessing.TimeoutError):
+            logging.error(f"Forecast for {scope_key} timed out after {FORECAST_FIT_TIMEOUT}s")
+            _discard_pool(pool)
+        else:
+            logging.error(f"Forecast for {scope_key} failed: {e}")
+        forecast = None
+
+    row = {
+        "scope_key": scope_key,
+        "data_fingerprint": fingerprint,
+        "status": "failed" if forecast is None else "ready",
+        "created_at": datetime.utcnow(),
+    }
+    replace_columns = ("data_fingerprint", "status", "created_at")
+    if forecast is not None:
+        row["forecast"] = json.dumps(forecast)
+        replace_columns += ("forecast",)
+
+    upsert_add(ForecastCache, [row], key_columns=("scope_key",), sum_columns=(), replace_columns=replace_columns)
+    db.session.commit()
+
+
+def _forecast_weeks(row):
+    if row is None or row.forecast is None:
+        return []
+    return [
+        {
+            "week": period_label(datetime.strptime(p["ds"], "%Y-%m-%d"), "week"),
+            "predictedScore": p["yhat"],
+            "lower": p["yhat_lower"],
+            "upper": p["yhat_upper"],
+        }
+        for p in json.loads(row.forecast)
+    ]
+
+
+def cached_forecast(scope_key, *filters):
+    """
+    Weekly accuracy forecast for the rollup scope `filters`, never fitted in
+    the request. A cached forecast is served as long as the scope's weekly
+    series is unchanged; otherwise a refit is queued in the background and
+    the previous forecast (if any) is returned marked stale. When the fit of
+    the current series failed, the previous forecast (if any) is returned
+    marked failed, and the fit is retried after FORECAST_RETRY_HOURS.
+
+    Returns {"status": "ready" | "stale" | "pending" | "failed" | "insufficient_data",
+             "weeks": [{"week", "predictedScore", "lower", "upper"}]}
+    """
+    points = [
+        (start.strftime("%Y-%m-%d"), score)
+        for start, score in accuracy_trend("week", *filters)
+    ]
+    if len(points) < FORECAST_MIN_POINTS:
+        return {"status": "insufficient_data", "weeks": []}
+
+    fingerprint = series_fingerprint(points)
+    row = ForecastCache.query.filter_by(scope_key=scope_key).first()
+
+    if row is not None and row.data_fingerprint == fingerprint:
+        if row.status == "ready":
+            return {"status": "ready", "weeks": _forecast_weeks(row)}
+        if row.created_at > datetime.utcnow() - timedelta(hours=FORECAST_RETRY_HOURS):
+            return {"status": "failed", "weeks": _forecast_weeks(row)}
+
+    submit_job(
+        compute_forecast,
+        scope_key,
+        points,
+        fingerprint,
+        job_id=f"forecast-{scope_key}",
+    )
+
+    if row is not None and row.forecast is not None:
+        return {"status": "stale", "weeks": _forecast_weeks(row)}
+    return {"status": "pending", "weeks": []}
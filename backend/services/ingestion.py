@@ -0,0 +1,190 @@
+# backend/services/ingestion.py
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from backend.models import db, ChatLog, QuizResult, QuizTopicResult
+from backend.utils.db import insert_ignore
+from .chat_analysis import chat_scores
+from .conversations import parse_iso_timestamp
+from .quiz_results import aggregate_answers
+from .rollups import quiz_rollup_deltas, apply_rollup_deltas
+
+# Chat turns + quiz results accepted per /send-batch request
+INGEST_BATCH_MAX_ITEMS = int(os.getenv("INGEST_BATCH_MAX_ITEMS", 500))
+CLIENT_ID_MAX_LENGTH = 64
+
+
+def _timestamp(value):
+    if value in (None, ""):
+        return datetime.utcnow()
+    try:
+        return parse_iso_timestamp(value)
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+
+
+def _prepare(items, build):
+    """
+    Per-item results (in request order) and {client_id: row} of the items
+    to insert. `build` turns an item into its row or raises ValueError.
+    A client id repeated within the batch only counts once.
+    """
+    results = []
+    rows = {}
+
+    for item in items:
+        client_id = item.get("client_id") if isinstance(item, dict) else None
+        result = {"client_id": client_id}
+        results.append(result)
+
+        if not isinstance(client_id, str) or not 0 < len(client_id) <= CLIENT_ID_MAX_LENGTH:
+            result.update(status="invalid", error=f"client_id must be a string of 1-{CLIENT_ID_MAX_LENGTH} characters")
+            continue
+        if client_id in rows:
+            result["status"] = "duplicate"
+            continue
+        try:
+            rows[client_id] = build(item)
+        except ValueError as e:
+            result.update(status="invalid", error=str(e))
+
+    return results, rows
+
+
+def _insert_new(model, user_id, rows):
+    """
+    Inserts `rows` in one executemany, skipping those whose client id the
+    user already sent. {client_id: id} of the rows actually inserted.
+    """
+    if not rows:
+        return {}
+
+    if db.engine.dialect.name in ("postgresql", "sqlite"):
+        result = db.session.execute(insert_ignore(model).returning(model.id, model.client_id), rows)
+        return {client_id: row_id for row_id, client_id in result}
+
+    # Portable fallback: drop known client ids first, read the new ids back
+    sent = select(model.client_id, model.id).where(model.user_id == user_id)
+    existing = {
+        client_id for client_id, _ in
+        db.session.execute(sent.where(model.client_id.in_([r["client_id"] for r in rows])))
+    }
+    rows = [r for r in rows if r["client_id"] not in existing]
+    if not rows:
+        return {}
+    db.session.execute(insert(model), rows)
+    return dict(db.session.execute(sent.where(model.client_id.in_([r["client_id"] for r in rows]))).all())
+
+
+def _finish(results, inserted):
+    for result in results:
+        if "status" not in result:
+            result["status"] = "created" if result["client_id"] in inserted else "duplicate"
+    return results
+
+
+def add_chat_logs(user_id, messages):
+    """Stores scored chat turns ([{"user_message", "bot_response"}]) in one executemany. Caller commits."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "user_message": msg.get("user_message"),
+            "bot_response": msg.get("bot_response"),
+            "sent_at": now,
+            **chat_scores(msg.get("user_message"), msg.get("bot_response")),
+        }
+        for msg in messages
+    ]
+    if rows:
+        db.session.execute(insert(ChatLog), rows)
+
+
+def ingest_chat_logs(user_id, items):
+    """
+    Batch of chat turns [{"client_id", "user_message", "bot_response",
+    "sent_at"?}] -> [{"client_id", "status": created|duplicate|invalid}].
+    Caller commits.
+    """
+    def build(item):
+        user_message, bot_response = item.get("user_message"), item.get("bot_response")
+        if not all(v is None or isinstance(v, str) for v in (user_message, bot_response)):
+            raise ValueError("user_message and bot_response must be strings")
+        if not (user_message or bot_response):
+            raise ValueError("user_message or bot_response is required")
+        return {
+            "user_id": user_id,
+            "client_id": item["client_id"],
+            "user_message": user_message,
+            "bot_response": bot_response,
+            "sent_at": _timestamp(item.get("sent_at")),
+            **chat_scores(user_message, bot_response),
+        }
+
+    results, rows = _prepare(items, build)
+    inserted = _insert_new(ChatLog, user_id, list(rows.values()))
+    return _finish(results, inserted)
+
+
+def ingest_quiz_results(user, items):
+    """
+    Batch of quiz results [{"client_id", "summary_data" (raw answers, as
+    for /send-quiz-results), "taken_at"?}] -> [{"client_id", "status",
+    "summary" when created}]. Topic rows go in with one executemany and
+    the rollups with one upsert. Caller commits.
+    """
+    summaries = {}
+
+    def build(item):
+        raw_answers = item.get("summary_data")
+        if not raw_answers or not isinstance(raw_answers, dict) \
+                or not all(isinstance(q, dict) for q in raw_answers.values()):
+            raise ValueError("summary_data must be a non-empty object of answers")
+        summary = aggregate_answers(raw_answers)
+        summaries[item["client_id"]] = summary
+        return {
+            "user_id": user.id,
+            "client_id": item["client_id"],
+            "summary_data": json.dumps(summary),
+            "taken_at": _timestamp(item.get("taken_at")),
+        }
+
+    results, rows = _prepare(items, build)
+    inserted = _insert_new(QuizResult, user.id, list(rows.values()))
+
+    profile = user.student_profile
+    topic_rows = []
+    deltas = []
+    for client_id, result_id in inserted.items():
+        taken_at = rows[client_id]["taken_at"]
+        for entry in summaries[client_id]:
+            topic_rows.append({
+                "quiz_result_id": result_id,
+                "user_id": user.id,
+                "school_id": user.school_id,
+                "topic": entry.get("topic", "Unknown"),
+                "correct": entry.get("correct", 0),
+                "total": entry.get("total", 0),
+                "taken_at": taken_at,
+            })
+        deltas.extend(quiz_rollup_deltas(
+            user.id,
+            user.school_id,
+            profile.grade if profile else None,
+            profile.section if profile else None,
+            summaries[client_id],
+            taken_at,
+        ))
+
+    if topic_rows:
+        db.session.execute(insert(QuizTopicResult), topic_rows)
+    if deltas:
+        apply_rollup_deltas(deltas)
+
+    for result in _finish(results, inserted):
+        if result["status"] == "created":
+            result["summary"] = summaries[result["client_id"]]
+    return results
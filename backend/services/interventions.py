@@ -1,5 +1,17 @@
+import hashlib
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from backend.models import db, InterventionCache
+from backend.utils.db import upsert_add
 from backend.services.chatbot.chatbot import ChatBot
+from backend.services.request_metrics import charged_to_request
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_TIME_BUDGET = 60  # seconds for the whole batch
+DEFAULT_CACHE_TTL_HOURS = 24 * 7
+DEFAULT_CACHE_MAX_ENTRIES = 5000
 
 
 def build_intervention_context(student, quiz_analysis, profile):
@@ -59,3 +71,151 @@ def fallback_intervention(context):
         )
 
     return " ".join(suggestions) or "Student is progressing normally. Continue regular monitoring."
+
+
+def _generate_llm_batch(contexts, chatbot, max_workers, time_budget):
+    """
+    Runs generate_intervention_text for every context on a bounded thread
+    pool. Returns the LLM text per context, or None where the call failed
+    or missed the `time_budget` deadline.
+    """
+    if not contexts:
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(contexts))))
+    generate = charged_to_request(generate_intervention_text)
+    futures = [
+        executor.submit(generate, context, chatbot)
+        for context in contexts
+    ]
+
+    done, not_done = wait(futures, timeout=time_budget)
+
+    # Don't hold the request open for calls that missed the deadline
+    executor.shutdown(wait=False, cancel_futures=True)
+    if not_done:
+        logging.warning(
+            f"{len(not_done)} of {len(contexts)} interventions missed the {time_budget}s budget"
+        )
+
+    return [
+        future.result() if future in done else None
+        for future in futures
+    ]
+
+
+def generate_interventions(contexts, chatbot: ChatBot, max_workers=DEFAULT_MAX_WORKERS, time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Generates intervention texts for many students concurrently.
+
+    At most `max_workers` LLM calls run at once. Any student whose call has
+    not finished within `time_budget` seconds (or failed) gets the
+    rule-based fallback instead. Results are returned in the same order as
+    `contexts`.
+    """
+    texts = _generate_llm_batch(contexts, chatbot, max_workers, time_budget)
+    return [
+        text or fallback_intervention(context)
+        for context, text in zip(contexts, texts)
+    ]
+
+
+# ---------------- Intervention cache ----------------
+
+def intervention_fingerprint(context):
+    """Stable hash of a build_intervention_context() result."""
+    payload = json.dumps(context, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def evict_intervention_cache(ttl_hours=DEFAULT_CACHE_TTL_HOURS, max_entries=DEFAULT_CACHE_MAX_ENTRIES):
+    """Drops expired entries, then the least recently used ones above `max_entries`."""
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+    InterventionCache.query.filter(
+        InterventionCache.created_at < cutoff
+    ).delete(synchronize_session=False)
+
+    overflow = InterventionCache.query.count() - max_entries
+    if overflow > 0:
+        oldest = (
+            db.session.query(InterventionCache.id)
+            .order_by(InterventionCache.last_used_at.asc())
+            .limit(overflow)
+            .subquery()
+        )
+        InterventionCache.query.filter(
+            InterventionCache.id.in_(db.select(oldest.c.id))
+        ).delete(synchronize_session=False)
+
+
+def cached_interventions(
+    student_ids,
+    contexts,
+    chatbot: ChatBot,
+    max_workers=DEFAULT_MAX_WORKERS,
+    time_budget=DEFAULT_TIME_BUDGET,
+    ttl_hours=DEFAULT_CACHE_TTL_HOURS,
+    max_entries=DEFAULT_CACHE_MAX_ENTRIES,
+):
+    """
+    Same as generate_interventions, but reuses stored texts for students
+    whose intervention context has not changed. Only the remaining
+    students go to the LLM, and only real LLM answers are cached.
+    """
+    if not contexts:
+        return []
+
+    now = datetime.utcnow()
+    cutoff = now - timedelta(hours=ttl_hours)
+    fingerprints = [intervention_fingerprint(c) for c in contexts]
+
+    entries = {
+        e.fingerprint: e
+        for e in InterventionCache.query.filter(
+            InterventionCache.fingerprint.in_(set(fingerprints))
+        ).all()
+    }
+
+    texts = [None] * len(contexts)
+    misses = []
+    for i, fp in enumerate(fingerprints):
+        entry = entries.get(fp)
+        if entry and entry.created_at >= cutoff:
+            entry.last_used_at = now
+            texts[i] = entry.intervention
+        else:
+            misses.append(i)
+
+    generated = _generate_llm_batch(
+        [contexts[i] for i in misses], chatbot, max_workers, time_budget
+    )
+
+    rows = {}
+    for i, text in zip(misses, generated):
+        if not text:
+            texts[i] = fallback_intervention(contexts[i])
+            continue
+
+        texts[i] = text
+        rows[fingerprints[i]] = {
+            "fingerprint": fingerprints[i],
+            "student_id": student_ids[i],
+            "intervention": text,
+            "created_at": now,
+            "last_used_at": now,
+        }
+
+    # Expired entries are refreshed in place, and another worker caching
+    # the same context at the same time just overwrites it
+    upsert_add(
+        InterventionCache,
+        list(rows.values()),
+        key_columns=("fingerprint",),
+        sum_columns=(),
+        replace_columns=("student_id", "intervention", "created_at", "last_used_at"),
+    )
+    db.session.flush()
+    evict_intervention_cache(ttl_hours, max_entries)
+    db.session.commit()
+
+    return texts
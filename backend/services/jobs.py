@@ -0,0 +1,65 @@
+# backend/services/jobs.py
+import logging
+from datetime import datetime
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+_scheduler = None
+_app = None
+
+
+def init_jobs(app):
+    """
+    Starts the per-process background scheduler used for work that should
+    not run inside a request (notifications, backfills, refills...).
+    """
+    global _scheduler, _app
+
+    _app = app
+    if _scheduler is not None:
+        return _scheduler
+
+    _scheduler = BackgroundScheduler(
+        daemon=True,
+        job_defaults={
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": 60,
+        },
+    )
+    _scheduler.start()
+    return _scheduler
+
+
+def _run_with_app_context(func, args, kwargs):
+    with _app.app_context():
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            logging.exception(f"Background job {func.__name__} failed: {e}")
+            raise
+
+
+def submit_job(func, *args, job_id=None, **kwargs):
+    """
+    Runs `func(*args, **kwargs)` as soon as possible on the background
+    scheduler, inside an app context. Submitting again with the same
+    `job_id` while the first one is still queued replaces it, so bursts of
+    identical requests collapse into one run.
+
+    Falls back to running inline when the scheduler was never started
+    (scripts, shells).
+    """
+    if _scheduler is None:
+        return func(*args, **kwargs)
+
+    _scheduler.add_job(
+        _run_with_app_context,
+        trigger="date",
+        run_date=datetime.now(),
+        args=(func, args, kwargs),
+        id=job_id,
+        name=func.__name__,
+        replace_existing=job_id is not None,
+    )
+
@@ -0,0 +1,59 @@
+# backend/services/model_registry.py
+import hashlib
+import logging
+import os
+import threading
+
+import joblib
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model")
+
+# name -> (file in MODEL_DIR, sha256 of the shipped artifact)
+ARTIFACTS = {
+    "classifier": ("model.pkl", "f58fa1332894c2f4f7579cef310585bf77c7a9de8d84d233d5782a806166fbe3"),
+    "vectorizer": ("vectorizer.pkl", "55005c1c6445c9bc5a88fe83d8c2fd67c06f08bfccab827945106c09a794e1a8"),
+}
+
+_models = {}
+_lock = threading.Lock()
+
+
+class ModelIntegrityError(Exception):
+    pass
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load(name):
+    filename, expected = ARTIFACTS[name]
+    path = os.path.join(MODEL_DIR, filename)
+
+    actual = _sha256(path)
+    if actual != expected:
+        raise ModelIntegrityError(f"{filename}: checksum {actual} does not match {expected}")
+
+    model = joblib.load(path)
+    logging.info(f"Loaded model artifact {name} ({filename})")
+    return model
+
+
+def get_model(name):
+    """
+    The artifact `name` (see ARTIFACTS), loaded and checksum-verified on
+    first use, then shared by every caller in the process.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        if name not in _models:
+            _models[name] = _load(name)
+        return _models[name]
+
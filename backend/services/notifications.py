@@ -1,7 +1,13 @@
 import datetime
 from datetime import timedelta
 from backend.models import *
-from .academic_metrics import academic_weekly_delta
+from sqlalchemy import func
+from backend.utils.db import insert_ignore
+from .academic_metrics import academic_weekly_deltas
+from .jobs import submit_job
+
+INACTIVITY_DAYS = 7
+INACTIVITY_CATEGORIES = ["sports", "art"]
 
 def academic_drop_notification(prev, curr):
     if prev is None or curr is None:
@@ -19,25 +25,19 @@ def academic_drop_notification(prev, curr):
 
 
 
-def missed_goal_notification(goals):
-    overdue = [g for g in goals if g.status != "completed" and g.deadline < datetime.utcnow()]
-    if overdue:
+def missed_goal_notification(overdue_count):
+    if overdue_count:
         return {
             "type": "goals",
             "title": "Missed learning goals",
-            "message": f"{len(overdue)} goals were missed this week.",
+            "message": f"{overdue_count} goals were missed this week.",
             "severity": "critical"
         }
     return None
 
 
-def inactivity_notification(activities, category, days=7):
-    recent = [
-        a for a in activities
-        if a.category == category and a.created_at > datetime.utcnow() - timedelta(days=days)
-    ]
-
-    if not recent:
+def inactivity_notification(has_recent_activity, category, days=INACTIVITY_DAYS):
+    if not has_recent_activity:
         return {
             "type": "wellbeing",
             "title": f"Low {category} activity",
@@ -47,36 +47,114 @@ def inactivity_notification(activities, category, days=7):
     return None
 
 
-def generate_parent_notifications():
-    parents = User.query.filter_by(role="parent").all()
+def notification_period(now=None):
+    """Notifications are generated at most once per parent/detector per ISO week."""
+    return (now or datetime.utcnow()).strftime("%G-W%V")
+
+
+def _parent_student_pairs(parent_ids=None):
+    """(parent_id, student_id) for every parent whose child account exists."""
+    query = (
+        db.session.query(ParentProfile.user_id, User.id)
+        .join(User, User.email == ParentProfile.child_email)
+    )
+    if parent_ids is not None:
+        query = query.filter(ParentProfile.user_id.in_(parent_ids))
+    return query.all()
+
+
+def _overdue_goal_counts(student_ids, now):
+    """{student_id: number of unfinished goals past their deadline}"""
+    query = (
+        db.session.query(Goal.user_id, func.count(Goal.id))
+        .filter(
+            db.or_(Goal.status.is_(None), Goal.status != "completed"),
+            Goal.deadline < now
+        )
+        .group_by(Goal.user_id)
+    )
+    if student_ids is not None:
+        query = query.filter(Goal.user_id.in_(student_ids))
+    return dict(query.all())
+
+
+def _recently_active(student_ids, categories, now, days=INACTIVITY_DAYS):
+    """{(student_id, category)} that logged an activity in the last `days` days."""
+    query = (
+        db.session.query(Activity.user_id, Activity.category)
+        .filter(
+            Activity.category.in_(categories),
+            Activity.created_at > now - timedelta(days=days)
+        )
+        .distinct()
+    )
+    if student_ids is not None:
+        query = query.filter(Activity.user_id.in_(student_ids))
+    return set(query.all())
 
-    for parent in parents:
-        student = User.query.filter_by(email=parent.parent_profile.child_email).first()
-        
-        if not student:
-            print(f"Skipping parent {parent.id}: No student found with email {parent.parent_profile.child_email}")
-            continue
-        student_id = student.id
-        
-        quizzes = QuizResult.query.filter_by(user_id=student_id).all()
-        activities = Activity.query.filter_by(user_id=student_id).all()
-        goals = Goal.query.filter_by(user_id=student_id).all()
 
-        prev, curr = academic_weekly_delta(quizzes)
+def generate_parent_notifications(parent_ids=None):
+    """
+    Runs the detectors for every parent (or only `parent_ids`) and stores
+    new notifications. Safe to call repeatedly: a parent gets at most one
+    notification per detector per period.
+
+    Each detector is a single grouped query over all students, so the cost
+    no longer grows with one round trip per parent.
+    """
+    now = datetime.utcnow()
+    period = notification_period(now)
+
+    pairs = _parent_student_pairs(parent_ids)
+    if not pairs:
+        return
+
+    # Scope the aggregates only when a subset of parents was requested
+    student_ids = None
+    if parent_ids is not None:
+        student_ids = list({student_id for _, student_id in pairs})
+
+    deltas = academic_weekly_deltas(student_ids, now)
+    overdue = _overdue_goal_counts(student_ids, now)
+    active = _recently_active(student_ids, INACTIVITY_CATEGORIES, now)
+
+    rows = []
+    for parent_id, student_id in pairs:
+        prev, curr = deltas.get(student_id, (None, None))
 
         detectors = [
-            academic_drop_notification(prev, curr),
-            missed_goal_notification(goals),
-            inactivity_notification(activities, "sports"),
-            inactivity_notification(activities, "art"),
+            ("academic_drop", academic_drop_notification(prev, curr)),
+            ("missed_goals", missed_goal_notification(overdue.get(student_id, 0))),
+        ] + [
+            (
+                f"inactivity_{category}",
+                inactivity_notification((student_id, category) in active, category)
+            )
+            for category in INACTIVITY_CATEGORIES
         ]
 
-        for d in detectors:
+        for detector, d in detectors:
             if d:
-                db.session.add(Notification(
-                    user_id=parent.id,
-                    student_id=student_id,
+                rows.append({
+                    "user_id": parent_id,
+                    "student_id": student_id,
+                    "detector": detector,
+                    "period": period,
+                    "read": False,
+                    "created_at": now,
                     **d
-                ))
+                })
 
+    # Rows already stored for this period are skipped by the unique constraint
+    if rows:
+        db.session.execute(insert_ignore(Notification), rows)
     db.session.commit()
+
+
+def enqueue_parent_notifications(parent_id):
+    """Generates one parent's notifications in the background."""
+    submit_job(
+        generate_parent_notifications,
+        [parent_id],
+        job_id=f"parent-notifications-{parent_id}",
+    )
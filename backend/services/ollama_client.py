@@ -0,0 +1,172 @@
+# backend/services/ollama_client.py
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .request_metrics import add_llm_time
+
+load_dotenv()
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST")
+DEFAULT_MODEL = "llama3"
+
+CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", 10))
+READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", 300))  # max wait between two chunks
+MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", 3))
+POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", 10))
+
+
+class OllamaError(Exception):
+    pass
+
+
+class OllamaMetrics:
+    """Running totals of Ollama generations (durations in seconds)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.ttft_total = 0.0
+        self.ttft_max = 0.0
+        self.duration_total = 0.0
+        self.duration_max = 0.0
+
+    def record(self, ttft, duration, failed=False):
+        with self._lock:
+            self.requests += 1
+            if failed:
+                self.failures += 1
+            if ttft is not None:
+                self.ttft_total += ttft
+                self.ttft_max = max(self.ttft_max, ttft)
+            self.duration_total += duration
+            self.duration_max = max(self.duration_max, duration)
+
+    def snapshot(self):
+        with self._lock:
+            succeeded = self.requests - self.failures
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "avg_ttft": round(self.ttft_total / succeeded, 3) if succeeded else None,
+                "max_ttft": round(self.ttft_max, 3),
+                "avg_duration": round(self.duration_total / self.requests, 3) if self.requests else None,
+                "max_duration": round(self.duration_max, 3),
+            }
+
+
+class OllamaClient:
+    """
+    Process-wide client for the Ollama host (often an ngrok tunnel).
+
+    One requests.Session with a pooled, keep-alive HTTPAdapter is shared by
+    every caller, so TCP/TLS handshakes are paid once per pooled connection
+    instead of once per generation. Failed connects and 502/503/504 answers
+    are retried with exponential backoff; a generation that already started
+    streaming is never retried.
+    """
+
+    def __init__(
+        self,
+        host=OLLAMA_HOST,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        max_retries=MAX_RETRIES,
+        pool_size=POOL_SIZE,
+    ):
+        self.host = host.rstrip("/") if host else host
+        self.timeout = (connect_timeout, read_timeout)
+        self.metrics = OllamaMetrics()
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def stream(self, prompt, model=DEFAULT_MODEL, timeout=None, **options):
+        """
+        Yields response chunks of /api/generate as they arrive.
+        Raises OllamaError when the host is missing or Ollama reports an error.
+        """
+        if not self.host:
+            raise OllamaError("OLLAMA_HOST not set in .env file. Cannot connect.")
+
+        payload = {"model": model, "prompt": prompt, "stream": True, **options}
+        started = time.monotonic()
+        ttft = None
+        failed = True
+
+        try:
+            with self.session.post(
+                f"{self.host}/api/generate",
+                json=payload,
+                stream=True,
+                timeout=timeout or self.timeout,
+            ) as response:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.warning(f"Skipping undecodable Ollama line: {line[:200]!r}")
+                        continue
+
+                    # Explicit error message from Ollama itself
+                    if data.get("error"):
+                        raise OllamaError(data["error"])
+
+                    chunk = data.get("response")
+                    if chunk:
+                        if ttft is None:
+                            ttft = time.monotonic() - started
+                        yield chunk
+
+                    # No break on "done": reading the stream to its end lets
+                    # the connection go back to the pool instead of being closed
+
+            failed = False
+        finally:
+            duration = time.monotonic() - started
+            self.metrics.record(ttft, duration, failed=failed)
+            add_llm_time(duration)
+
+    def generate(self, prompt, model=DEFAULT_MODEL, timeout=None, **options):
+        """Full (stripped) response text of one generation."""
+        return "".join(self.stream(prompt, model=model, timeout=timeout, **options)).strip()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client():
+    """The shared OllamaClient of this process, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+    return _client
@@ -0,0 +1,122 @@
+# backend/services/profile_store.py
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import joinedload
+
+from backend.models import db, User, StudentProfileSnapshot
+from backend.utils.db import upsert_add
+from .jobs import submit_job
+from .section_data import load_section_data, build_section_profiles, section_student_info
+
+# Profiles are refreshed on writes, but their activity/progress parts are
+# rolling windows: rebuild a snapshot on read once it is older than this
+PROFILE_SNAPSHOT_MAX_AGE_HOURS = float(os.getenv("PROFILE_SNAPSHOT_MAX_AGE_HOURS", 24))
+
+
+def _store_snapshots(students):
+    """
+    Rebuilds the profiles of `students` from their raw data and writes them
+    to the snapshot table, bumping each row's version. Commits.
+    Returns {user_id: StudentProfileSnapshot}.
+    """
+    if not students:
+        return {}
+
+    data = load_section_data(students)
+
+    now = datetime.utcnow()
+    rows = []
+    for student, _, profile in build_section_profiles(students, data):
+        quiz_data = data["latest_quizzes"].get(student.id)
+        rows.append({
+            "user_id": student.id,
+            "profile_data": json.dumps(profile),
+            "quiz_data": json.dumps(quiz_data) if quiz_data is not None else None,
+            "version": 1,
+            "updated_at": now,
+        })
+
+    # ON CONFLICT: a background refresh and a request may store the same student at once
+    upsert_add(
+        StudentProfileSnapshot,
+        rows,
+        key_columns=("user_id",),
+        sum_columns=("version",),
+        replace_columns=("profile_data", "quiz_data", "updated_at"),
+    )
+    db.session.commit()
+
+    # Reload what the commit expired in two queries instead of one per object
+    student_ids = [s.id for s in students]
+    User.query.options(joinedload(User.student_profile)).filter(User.id.in_(student_ids)).all()
+    return {
+        s.user_id: s
+        for s in StudentProfileSnapshot.query.filter(StudentProfileSnapshot.user_id.in_(student_ids))
+    }
+
+
+def refresh_student_profiles(student_ids):
+    """Rebuilds the stored profiles of the given students."""
+    students = (
+        User.query
+        .options(joinedload(User.student_profile))
+        .filter(User.id.in_(student_ids), User.role == "student")
+        .all()
+    )
+    # Students without a profile row cannot be rendered
+    _store_snapshots([s for s in students if s.student_profile])
+
+
+def enqueue_profile_refresh(student_id):
+    """
+    Schedules a refresh of one student's stored profile after their quiz,
+    chat or activity data changed. Call after committing the change.
+    """
+    submit_job(
+        refresh_student_profiles,
+        [int(student_id)],
+        job_id=f"student-profile-{student_id}",
+    )
+
+
+def load_profile_snapshots(students):
+    """
+    Stored profiles for `students` (loaded with their student_profile),
+    rebuilding in one batch only the ones that were never materialized or
+    are older than PROFILE_SNAPSHOT_MAX_AGE_HOURS.
+    Returns {user_id: StudentProfileSnapshot}.
+    """
+    if not students:
+        return {}
+
+    snapshots = {
+        s.user_id: s
+        for s in StudentProfileSnapshot.query.filter(
+            StudentProfileSnapshot.user_id.in_([s.id for s in students])
+        )
+    }
+
+    cutoff = datetime.utcnow() - timedelta(hours=PROFILE_SNAPSHOT_MAX_AGE_HOURS)
+    outdated = [
+        s for s in students
+        if s.id not in snapshots or snapshots[s.id].updated_at is None or snapshots[s.id].updated_at < cutoff
+    ]
+    snapshots.update(_store_snapshots(outdated))
+    return snapshots
+
+
+def snapshot_profile(snapshot, student):
+    """
+    The stored dashboard profile. The identity card is taken from the
+    current user row so renames and grade changes show up immediately.
+    """
+    profile = json.loads(snapshot.profile_data)
+    profile["profile"] = section_student_info(student)
+    return profile
+
+
+def snapshot_quiz_data(snapshot):
+    """Topics of the latest quiz, or None when the student never took one."""
+    return json.loads(snapshot.quiz_data) if snapshot.quiz_data is not None else None
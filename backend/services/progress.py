@@ -1,7 +1,8 @@
 import calendar
 from collections import defaultdict
 from datetime import datetime
-import json
+from .analytics import accuracy_trend
+from .rollups import period_label, student_scope
 
 def normalize(value, max_value):
     if max_value == 0:
@@ -9,31 +10,15 @@ def normalize(value, max_value):
     return round(min((value / max_value) * 100, 100), 2)
 
 
-def academic_progress(quiz_results, period):
+def academic_progress(student_id, period):
     """
-    Uses QuizResult.summary_data
+    Per-quiz accuracy by week or month, read from the student's rollups.
     """
-    buckets = defaultdict(list)
-
-    for q in quiz_results:
-        data = json.loads(q.summary_data)
-
-        correct = sum(item["correct"] for item in data)
-        total = sum(item["total"] for item in data)
-
-        accuracy = normalize(correct, total)
-
-        label = (
-            q.taken_at.strftime("Week %U")
-            if period == "weekly"
-            else q.taken_at.strftime("%b %Y")
-        )
-
-        buckets[label].append(accuracy)
+    rollup_period = "week" if period == "weekly" else "month"
 
     trend = [
-        {"label": k, "academic": round(sum(v) / len(v), 2)}
-        for k, v in sorted(buckets.items())
+        {"label": period_label(start, rollup_period), "academic": score}
+        for start, score in accuracy_trend(rollup_period, *student_scope(student_id))
     ]
 
     latest = trend[-1]["academic"] if trend else 0
@@ -0,0 +1,195 @@
+# backend/services/question_bank.py
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import func
+
+from backend.models import db, QuestionBankTopic, QuestionBankQuestion
+from backend.utils.db import insert_ignore, upsert_add
+from .jobs import submit_job
+from .quiz_generator import generate_custom_quiz
+
+# A question is "fresh" until it was served this many times
+QUESTION_BANK_MAX_SERVES = int(os.getenv("QUESTION_BANK_MAX_SERVES", 5))
+# Refill a topic when it has fewer fresh questions than this...
+QUESTION_BANK_LOW_WATER = int(os.getenv("QUESTION_BANK_LOW_WATER", 20))
+# ...up to this many
+QUESTION_BANK_HIGH_WATER = int(os.getenv("QUESTION_BANK_HIGH_WATER", 40))
+QUESTION_BANK_POPULAR_TOPICS = int(os.getenv("QUESTION_BANK_POPULAR_TOPICS", 20))
+REFILL_BATCH_SIZE = 10  # questions asked of the LLM per call
+QUIZ_DIFFICULTIES = ("easy", "medium", "hard")
+MAX_REFILL_CALLS = 8
+# Wall-clock budget of `flask refill-question-bank` in the release phase; a
+# call already in flight when it runs out still finishes (QUIZ_TIMEOUT)
+QUESTION_BANK_RELEASE_BUDGET = float(os.getenv("QUESTION_BANK_RELEASE_BUDGET", 120))
+
+
+def topic_key(topic):
+    return " ".join(str(topic).lower().split())[:200]
+
+
+def question_hash(question):
+    text = " ".join(str(question.get("question", "")).lower().split())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _valid(question):
+    return (
+        isinstance(question, dict)
+        and question.get("question")
+        and isinstance(question.get("options"), list)
+        and question.get("answer") is not None
+    )
+
+
+def store_questions(topic, difficulty, questions, served=0):
+    """Adds generated questions to the bank, skipping invalid ones and duplicates. Caller commits."""
+    now = datetime.utcnow()
+    rows = {}
+    for q in questions:
+        if _valid(q):
+            h = question_hash(q)
+            rows[h] = {
+                "topic_key": topic_key(topic),
+                "difficulty": difficulty,
+                "question_hash": h,
+                "question": json.dumps({k: q[k] for k in ("question", "options", "answer")}),
+                "served_count": served,
+                "created_at": now,
+            }
+    if rows:
+        db.session.execute(insert_ignore(QuestionBankQuestion), list(rows.values()))
+    return len(rows)
+
+
+def fresh_count(topic, difficulty):
+    return (
+        QuestionBankQuestion.query
+        .filter(
+            QuestionBankQuestion.topic_key == topic_key(topic),
+            QuestionBankQuestion.difficulty == difficulty,
+            QuestionBankQuestion.served_count < QUESTION_BANK_MAX_SERVES,
+        )
+        .count()
+    )
+
+
+def refill_topic(topic, difficulty, deadline=None):
+    """
+    Background job: generates questions until the topic is back at the
+    high-water mark. Stops early once time.monotonic() passes `deadline`.
+    """
+    for _ in range(MAX_REFILL_CALLS):
+        if deadline is not None and time.monotonic() > deadline:
+            return
+        missing = QUESTION_BANK_HIGH_WATER - fresh_count(topic, difficulty)
+        if missing <= 0:
+            return
+
+        questions = generate_custom_quiz(topic, difficulty, min(REFILL_BATCH_SIZE, missing))
+        if not store_questions(topic, difficulty, questions):
+            logging.warning(f"Question bank refill for {topic!r} ({difficulty}) got no usable questions")
+            db.session.rollback()
+            return
+        db.session.commit()
+
+
+def enqueue_refill(topic, difficulty):
+    submit_job(
+        refill_topic,
+        topic,
+        difficulty,
+        job_id=f"question-bank-{hashlib.sha1(topic_key(topic).encode('utf-8')).hexdigest()[:16]}-{difficulty}",
+    )
+
+
+def refill_popular_topics(limit=QUESTION_BANK_POPULAR_TOPICS, background=True, deadline=None):
+    """
+    Refills every popular topic below the low-water mark: queued as
+    background jobs, or inline with background=False (for the
+    `flask refill-question-bank` command, which exits before queued jobs
+    would run). Inline refills stop once time.monotonic() passes
+    `deadline`; the remaining topics are left to request-time refills.
+    """
+    popular = (
+        QuestionBankTopic.query
+        .order_by(QuestionBankTopic.request_count.desc())
+        .limit(limit)
+        .all()
+    )
+    for entry in popular:
+        if fresh_count(entry.topic, entry.difficulty) >= QUESTION_BANK_LOW_WATER:
+            continue
+        if background:
+            enqueue_refill(entry.topic, entry.difficulty)
+        elif deadline is not None and time.monotonic() > deadline:
+            logging.warning("Question bank refill ran out of time; remaining topics left for later")
+            return
+        else:
+            refill_topic(entry.topic, entry.difficulty, deadline=deadline)
+
+
+def _record_request(topic, difficulty):
+    upsert_add(
+        QuestionBankTopic,
+        [{
+            "topic_key": topic_key(topic),
+            "difficulty": difficulty,
+            "topic": str(topic)[:200],
+            "request_count": 1,
+            "last_requested_at": datetime.utcnow(),
+        }],
+        key_columns=("topic_key", "difficulty"),
+        sum_columns=("request_count",),
+        replace_columns=("topic", "last_requested_at"),
+    )
+
+
+def _numbered(topic, questions):
+    """Questions in the /custom-quiz shape ("Custom-1", ... with the topic as subject)."""
+    return [
+        {"id": f"Custom-{i}", "subject": topic, **q}
+        for i, q in enumerate(questions, start=1)
+    ]
+
+
+def custom_quiz(topic, difficulty="medium", count=5):
+    """
+    `count` questions about `topic`, from the question bank when it holds
+    enough (least served first), otherwise generated live and banked. Either
+    way the topic is refilled in the background once it runs low.
+    """
+    _record_request(topic, difficulty)
+
+    rows = (
+        QuestionBankQuestion.query
+        .filter(
+            QuestionBankQuestion.topic_key == topic_key(topic),
+            QuestionBankQuestion.difficulty == difficulty,
+        )
+        .order_by(QuestionBankQuestion.served_count, func.random())
+        .limit(count)
+        .all()
+    )
+
+    if len(rows) >= count:
+        for row in rows:
+            row.served_count += 1
+        questions = [json.loads(row.question) for row in rows]
+        db.session.commit()
+    else:
+        # Unseen (or barely seen) topic: the only case that waits on the LLM
+        db.session.commit()
+        questions = [q for q in generate_custom_quiz(topic, difficulty, count) if _valid(q)]
+        store_questions(topic, difficulty, questions, served=1)
+        db.session.commit()
+        questions = [{k: q[k] for k in ("question", "options", "answer")} for q in questions]
+
+    if fresh_count(topic, difficulty) < QUESTION_BANK_LOW_WATER:
+        enqueue_refill(topic, difficulty)
+
+    return _numbered(topic, questions)
@@ -1,16 +1,10 @@
 # backend/services/quiz_generator.py
 
 import json
-from datetime import date
 
-import os
-from dotenv import load_dotenv
-import requests
-load_dotenv()
+from backend.services.ollama_client import get_ollama_client
 
-OLLAMA_HOST = os.getenv("OLLAMA_HOST")
-
-DAILY_CACHE = {}
+QUIZ_TIMEOUT = (10, 120)
 
 # Default fallback questions if Ollama fails or during development
 FALLBACK_QUESTIONS = {
@@ -24,10 +18,25 @@ FALLBACK_QUESTIONS = {
     ],
 }
 
+def parse_questions(text):
+    """
+    The JSON array of questions in an LLM answer, tolerating text or
+    markdown fences around it. Raises ValueError when there is none.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end <= start:
+            raise ValueError("No JSON array in quiz response")
+        return json.loads(text[start:end + 1])
+
 # 🔹 Generate AI-powered quizzes using Ollama
-def generate_quiz_with_ai(subject, difficulty="medium", count=5):
+def generate_quiz_with_ai(subject, difficulty="medium", count=5, strict=False):
     """
     Generate quiz questions dynamically using Ollama.
+    strict: raise on Ollama or parse errors (or no questions) instead of
+    returning the fallback questions.
     """
     prompt = f"""
     You are a professional educational content creator. 
@@ -62,59 +71,20 @@ def generate_quiz_with_ai(subject, difficulty="medium", count=5):
     """
 
     try:
-        response = requests.post(
-            f"{OLLAMA_HOST}/api/generate",
-            json={"model": "llama3", "prompt": prompt},
-            stream=True,
-            timeout=120
-        )
-
-        response.raise_for_status()
-
-        full_text = ""
-
         # collect ALL chunks from streaming API
-        for line in response.iter_lines():
-            if not line:
-                continue
-
-            try:
-                chunk = json.loads(line)
-            except:
-                continue
+        full_text = get_ollama_client().generate(prompt, model="llama3", timeout=QUIZ_TIMEOUT)
 
-            if "response" in chunk:
-                full_text += chunk["response"]
-
-        # Now parse final JSON text
-        return json.loads(full_text)  # This will now work
+        questions = parse_questions(full_text)
+        if strict and not (isinstance(questions, list) and questions):
+            raise ValueError(f"No {subject} questions in quiz response")
+        return questions
 
     except Exception as e:
+        if strict:
+            raise
         print(f"[⚠️ Ollama Error] {e}")
         return FALLBACK_QUESTIONS.get(subject, [])
 
-# 🔹 Main function to generate the daily quiz
-def generate_daily_quiz():
-    today = str(date.today())
-
-    if today in DAILY_CACHE:
-        return DAILY_CACHE[today]
-
-    subjects = ["Math", "Science", "English", "History"]
-
-    # Optional: use student profile to adjust difficulty
-    # profile = get_student_profile(user_id) if user_id else {}
-    # difficulty = profile.get("difficulty", "medium") if profile else "medium"
-
-    quiz_data = {}
-
-    for subject in subjects:
-        ai_quiz = generate_quiz_with_ai(subject=subject, count=5)
-        quiz_data[subject] = ai_quiz
-
-    DAILY_CACHE[today] = quiz_data
-    return quiz_data
-
 # 🔹 Generate a custom quiz on demand
 def generate_custom_quiz(topic, difficulty="medium", count=5):
     """
@@ -136,16 +106,8 @@ def generate_custom_quiz(topic, difficulty="medium", count=5):
     """
 
     try:
-        response = requests.post(
-                f"{OLLAMA_HOST}/api/generate",
-                json={"model": "llama3", "prompt": prompt},
-                stream=True,
-                timeout=120
-            )
-        response.raise_for_status()
-        content = response.json()["response"]
-        quiz_json = json.loads(content)
-        return quiz_json
+        content = get_ollama_client().generate(prompt, model="llama3", timeout=QUIZ_TIMEOUT)
+        return parse_questions(content)
 
     except Exception as e:
         print(f"[⚠️ Ollama Custom Quiz Error] {e}")
@@ -0,0 +1,82 @@
+# backend/services/quiz_results.py
+import json
+from datetime import datetime
+
+from backend.models import db, QuizResult, QuizTopicResult
+from .rollups import quiz_rollup_deltas, apply_rollup_deltas
+
+
+def aggregate_answers(raw_answers):
+    """
+    Collapses per-question answers into one entry per subject:
+    {"q1": {"subject": "Math", "isCorrect": true}, ...}
+    -> [{"topic": "Math", "correct": 1, "total": 1}]
+    """
+    topic_map = {}
+
+    for q in raw_answers.values():
+        subject = q.get("subject", "Unknown")
+
+        topic_map.setdefault(subject, {"topic": subject, "correct": 0, "total": 0})
+        topic_map[subject]["total"] += 1
+
+        if q.get("isCorrect") is True:
+            topic_map[subject]["correct"] += 1
+
+    return list(topic_map.values())
+
+
+def record_quiz_result(user, aggregated_summary, taken_at=None):
+    """
+    Stores a quiz result together with its normalized per-topic rows and
+    folds it into the academic rollups. The caller commits.
+    """
+    taken_at = taken_at or datetime.utcnow()
+
+    result = QuizResult(
+        user_id=user.id,
+        summary_data=json.dumps(aggregated_summary),
+        taken_at=taken_at
+    )
+    db.session.add(result)
+    db.session.flush()
+
+    for entry in aggregated_summary:
+        db.session.add(QuizTopicResult(
+            quiz_result_id=result.id,
+            user_id=user.id,
+            school_id=user.school_id,
+            topic=entry.get("topic", "Unknown"),
+            correct=entry.get("correct", 0),
+            total=entry.get("total", 0),
+            taken_at=taken_at
+        ))
+
+    profile = user.student_profile
+    apply_rollup_deltas(quiz_rollup_deltas(
+        user.id,
+        user.school_id,
+        profile.grade if profile else None,
+        profile.section if profile else None,
+        aggregated_summary,
+        taken_at,
+    ))
+
+    return result
+
+
+def topic_rows(*filters):
+    """
+    [{"topic", "correct", "total"}] for every QuizTopicResult matching
+    `filters`, in insertion order (same shape as QuizResult.summary_data).
+    """
+    rows = (
+        db.session.query(QuizTopicResult.topic, QuizTopicResult.correct, QuizTopicResult.total)
+        .filter(*filters)
+        .order_by(QuizTopicResult.id)
+        .all()
+    )
+    return [
+        {"topic": topic, "correct": correct, "total": total}
+        for topic, correct, total in rows
+    ]
@@ -0,0 +1,156 @@
+# backend/services/realtime.py
+import logging
+import socket
+import socketserver
+import threading
+import time
+from urllib.parse import urlparse
+
+import socketio
+
+LOCAL_QUEUE_PORT = 6390
+
+
+def conversation_room(user1_id, user2_id):
+    low, high = sorted([int(user1_id), int(user2_id)])
+    return f"conversation_{low}_{high}"
+
+
+def user_room(user_id):
+    return f"user_{int(user_id)}"
+
+
+def socketio_options(message_queue=None, channel="flask-socketio"):
+    """
+    SocketIO(...) keyword arguments for the configured fan-out backend.
+
+    Without a queue every worker only reaches its own sockets. With one,
+    emits are published on `channel` and delivered by whichever worker holds
+    the recipient's socket: redis://, rediss://, kafka://, zmq+tcp:// and
+    amqp:// URLs are handled by Flask-SocketIO itself, local://host:port uses
+    LocalQueueManager (development and load tests, no Redis needed).
+    """
+    if not message_queue:
+        return {}
+    if message_queue.startswith("local://"):
+        return {"client_manager": LocalQueueManager(message_queue, channel=channel)}
+    return {"message_queue": message_queue, "channel": channel}
+
+
+def publish_new_message(socketio_server, message_payload):
+    """
+    Delivers a `new_message` event to the open thread of both users and to
+    the receiver's personal room (inbox badge), each socket at most once.
+    """
+    sender_id = message_payload["senderId"]
+    receiver_id = message_payload["receiverId"]
+    socketio_server.emit(
+        "new_message",
+        message_payload,
+        to=[conversation_room(sender_id, receiver_id), user_room(receiver_id)],
+    )
+
+
+# -------------------------------------------------
+# Local stand-in for a Redis pub/sub channel
+# -------------------------------------------------
+
+class LocalQueueManager(socketio.PubSubManager):
+    """
+    Socket.IO client manager publishing through a local broker
+    (run_local_broker) over TCP, one JSON message per line. Same role as
+    socketio.RedisManager, for machines without Redis.
+    """
+    name = "local"
+
+    def __init__(self, url=f"local://127.0.0.1:{LOCAL_QUEUE_PORT}", channel="socketio",
+                 write_only=False, logger=None, json=None):
+        parsed = urlparse(url)
+        self.address = (parsed.hostname or "127.0.0.1", parsed.port or LOCAL_QUEUE_PORT)
+        self._publisher = None
+        self._publish_lock = threading.Lock()
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+
+    def _connect(self, role):
+        conn = socket.create_connection(self.address, timeout=10)
+        conn.settimeout(None)
+        conn.sendall(f"{role} {self.channel}\n".encode("utf-8"))
+        return conn
+
+    def _publish(self, data):
+        line = (self.json.dumps(data) + "\n").encode("utf-8")
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect("pub")
+                    self._publisher.sendall(line)
+                    return
+                except OSError:
+                    self._publisher = None
+                    if attempt:
+                        raise
+
+    def _listen(self):
+        while True:
+            try:
+                with self._connect("sub") as conn, conn.makefile("rb") as stream:
+                    for line in stream:
+                        yield line
+            except OSError as e:
+                self._get_logger().warning(f"Local queue at {self.address} unavailable: {e}")
+            time.sleep(1)
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        role, _, channel = self.rfile.readline().decode("utf-8").strip().partition(" ")
+        broker = self.server
+
+        if role == "sub":
+            with broker.lock:
+                broker.subscribers.setdefault(channel, set()).add(self.wfile)
+            self.rfile.read()  # block until the subscriber goes away
+            with broker.lock:
+                broker.subscribers[channel].discard(self.wfile)
+            return
+
+        for line in self.rfile:
+            with broker.lock:
+                for wfile in list(broker.subscribers.get(channel, ())):
+                    try:
+                        wfile.write(line)
+                        wfile.flush()
+                    except OSError:
+                        broker.subscribers[channel].discard(wfile)
+
+
+class _Broker(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _BrokerHandler)
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+
+def run_local_broker(host="127.0.0.1", port=LOCAL_QUEUE_PORT, background=False):
+    """
+    Serves the local:// queue: every line published on a channel is
+    forwarded to all subscribers of that channel. With `background` it runs
+    in a daemon thread and the server is returned.
+    """
+    broker = _Broker((host, port))
+    logging.info(f"Local Socket.IO queue listening on {host}:{port}")
+    if not background:
+        broker.serve_forever()
+        return broker
+
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+    return broker
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_local_broker()
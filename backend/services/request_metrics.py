@@ -0,0 +1,289 @@
+# backend/services/request_metrics.py
+import functools
+import logging
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from backend.models import db
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+ROUTE_LABELS = ("method", "route")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, label_names):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.values = {}
+
+    def inc(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, label_names, buckets):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}  # labels -> [count per bucket..., sum, count]
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-2] + [series[-1]]):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {series[-1]}")
+        return lines
+
+
+class RequestMetrics:
+    """
+    Per-route request metrics of this process, in Prometheus text format.
+    Every gunicorn worker keeps its own (counters restart with the worker).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            "brightpath_http_requests_total", "HTTP requests handled.", ROUTE_LABELS + ("status",)
+        )
+        self.over_budget = Counter(
+            "brightpath_http_requests_over_budget_total",
+            "HTTP requests that exceeded the latency or SQL query budget.",
+            ROUTE_LABELS + ("budget",),
+        )
+        self.duration = Histogram(
+            "brightpath_http_request_duration_seconds", "Wall time of HTTP requests.", ROUTE_LABELS, DURATION_BUCKETS
+        )
+        self.db_time = Histogram(
+            "brightpath_http_request_db_seconds", "Time spent executing SQL per request.", ROUTE_LABELS, DURATION_BUCKETS
+        )
+        self.queries = Histogram(
+            "brightpath_http_request_sql_queries", "SQL statements executed per request.", ROUTE_LABELS, QUERY_BUCKETS
+        )
+        self.llm_time = Histogram(
+            "brightpath_http_request_llm_seconds", "Time spent waiting on Ollama per request.", ROUTE_LABELS, DURATION_BUCKETS
+        )
+        self.response_size = Histogram(
+            "brightpath_http_response_size_bytes", "Size of HTTP response bodies.", ROUTE_LABELS, SIZE_BUCKETS
+        )
+
+    def record(self, method, route, status, stats, size, over_budget=()):
+        labels = (method, route)
+        with self._lock:
+            self.requests.inc(labels + (str(status),))
+            self.duration.observe(labels, stats.duration)
+            self.db_time.observe(labels, stats.sql_time)
+            self.queries.observe(labels, stats.sql_count)
+            self.llm_time.observe(labels, stats.llm_time)
+            if size is not None:
+                self.response_size.observe(labels, size)
+            for budget in over_budget:
+                self.over_budget.inc(labels + (budget,))
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in (
+                self.requests, self.over_budget, self.duration, self.db_time,
+                self.queries, self.llm_time, self.response_size,
+            ):
+                lines.extend(metric.render())
+        return lines
+
+
+class RequestStats:
+    """What one request spent so far (seconds, statements)."""
+
+    __slots__ = ("started", "duration", "sql_count", "sql_time", "llm_time")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.llm_time = 0.0
+
+
+metrics = RequestMetrics()
+
+_thread = threading.local()  # .stats: what a pool thread is charged to (see charged_to)
+_merge_lock = threading.Lock()
+
+
+def current_stats():
+    """
+    RequestStats the running code is charged to: the request being handled,
+    or the request that handed this pool thread its work. None otherwise.
+    """
+    if has_request_context():
+        return g.get("request_stats")
+    return getattr(_thread, "stats", None)
+
+
+def charged_to_request(func):
+    """
+    `func` wrapped so that its SQL and LLM time is charged to the current
+    request even when a thread pool runs it. Wrap in the request thread.
+    """
+    request_stats = current_stats()
+    if request_stats is None:
+        return func
+
+    @functools.wraps(func)
+    def charged(*args, **kwargs):
+        stats = _thread.stats = RequestStats()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _thread.stats = None
+            # Pool threads finish concurrently; add their totals one at a time
+            with _merge_lock:
+                request_stats.sql_count += stats.sql_count
+                request_stats.sql_time += stats.sql_time
+                request_stats.llm_time += stats.llm_time
+
+    return charged
+
+
+def add_llm_time(seconds):
+    """Charges an LLM call to the current request, if any."""
+    stats = current_stats()
+    if stats is not None:
+        stats.llm_time += seconds
+
+
+# The start time lives on the statement's execution context, which is
+# discarded with it, so a failing statement (no after_cursor_execute)
+# leaves nothing behind on the connection.
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    stats = current_stats()
+    if stats is not None and started is not None:
+        stats.sql_count += 1
+        stats.sql_time += time.perf_counter() - started
+
+
+def init_request_metrics(app):
+    """
+    Times every request of `app` and counts its SQL statements (SQLAlchemy
+    cursor events), SQL time and LLM time. Requests over the configured
+    latency or query budget are logged with a warning.
+
+    Background jobs and the body of streamed responses are not charged to
+    the request; thread pools are when their work is wrapped with
+    charged_to_request().
+    """
+    latency_budget = app.config["REQUEST_LATENCY_BUDGET"]
+    query_budget = app.config["REQUEST_QUERY_BUDGET"]
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_request_stats():
+        g.request_stats = RequestStats()
+
+    @app.after_request
+    def record_request_stats(response):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return response
+        stats.duration = time.perf_counter() - stats.started
+
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        over_budget = []
+        if latency_budget and stats.duration > latency_budget:
+            over_budget.append("latency")
+        if query_budget and stats.sql_count > query_budget:
+            over_budget.append("queries")
+
+        metrics.record(request.method, route, response.status_code, stats, response.content_length, over_budget)
+
+        if over_budget:
+            logging.warning(
+                f"{request.method} {route} over budget: {stats.duration:.3f}s "
+                f"(budget {latency_budget}s), {stats.sql_count} SQL statements (budget {query_budget}), "
+                f"db {stats.sql_time:.3f}s, llm {stats.llm_time:.3f}s"
+            )
+        return response
+
+
+def render_metrics(llm=None):
+    """
+    Prometheus text exposition of the request metrics, plus the totals of
+    an OllamaMetrics snapshot when given.
+    """
+    lines = metrics.render()
+
+    if llm is not None:
+        lines += [
+            "# HELP brightpath_llm_requests_total Ollama generations started.",
+            "# TYPE brightpath_llm_requests_total counter",
+            f"brightpath_llm_requests_total {llm['requests']}",
+            "# HELP brightpath_llm_failures_total Ollama generations that failed.",
+            "# TYPE brightpath_llm_failures_total counter",
+            f"brightpath_llm_failures_total {llm['failures']}",
+        ]
+        for key, help in (
+            ("avg_ttft", "Average time to first token."),
+            ("max_ttft", "Longest time to first token."),
+            ("avg_duration", "Average generation time."),
+            ("max_duration", "Longest generation time."),
+        ):
+            if llm[key] is not None:
+                lines += [
+                    f"# HELP brightpath_llm_{key}_seconds {help}",
+                    f"# TYPE brightpath_llm_{key}_seconds gauge",
+                    f"brightpath_llm_{key}_seconds {_number(float(llm[key]))}",
+                ]
+
+    return "\n".join(lines) + "\n"
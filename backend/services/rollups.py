@@ -0,0 +1,146 @@
+# backend/services/rollups.py
+from datetime import date, datetime, timedelta
+
+from backend.models import db, AcademicRollup
+from backend.utils.db import upsert_add
+
+PERIODS = ("week", "month")
+ALL_SUBJECTS = ""
+SECTION_ROW = 0  # user_id of whole grade/section rows
+
+SUM_COLUMNS = ("correct", "total", "quiz_count", "accuracy_sum")
+KEY_COLUMNS = ("school_id", "grade", "section", "user_id", "subject", "period", "period_start")
+
+
+def period_start(taken_at, period):
+    """First day of the "%U" week (Sunday-based) or of the month."""
+    day = taken_at.date() if isinstance(taken_at, datetime) else taken_at
+    if period == "week":
+        return day - timedelta(days=(day.weekday() + 1) % 7)
+    return date(day.year, day.month, 1)
+
+
+def period_label(start, period):
+    """Same labels the dashboards always used: "Week 41" / "Oct 2026"."""
+    return start.strftime("Week %U") if period == "week" else start.strftime("%b %Y")
+
+
+def quiz_rollup_deltas(user_id, school_id, grade, section, entries, taken_at):
+    """
+    Rollup increments for one quiz result. `entries` is the aggregated
+    summary: [{"topic": ..., "correct": ..., "total": ...}].
+    """
+    correct = sum(e.get("correct", 0) for e in entries)
+    total = sum(e.get("total", 0) for e in entries)
+    accuracy = round((correct / total) * 100, 2) if total else 0
+
+    deltas = []
+    for period in PERIODS:
+        start = period_start(taken_at, period)
+        for owner in (user_id, SECTION_ROW):
+            base = {
+                "school_id": school_id or 0,
+                "grade": grade or "",
+                "section": section or "",
+                "user_id": owner,
+                "period": period,
+                "period_start": start,
+            }
+            deltas.append({
+                **base,
+                "subject": ALL_SUBJECTS,
+                "correct": correct,
+                "total": total,
+                "quiz_count": 1,
+                "accuracy_sum": accuracy,
+            })
+            for e in entries:
+                deltas.append({
+                    **base,
+                    "subject": e.get("topic", "Unknown"),
+                    "correct": e.get("correct", 0),
+                    "total": e.get("total", 0),
+                    "quiz_count": 1,
+                    "accuracy_sum": 0.0,
+                })
+    return deltas
+
+
+def apply_rollup_deltas(deltas):
+    """Merges deltas with the same key and upserts them in one statement. Caller commits."""
+    merged = {}
+    for d in deltas:
+        key = tuple(d[c] for c in KEY_COLUMNS)
+        if key in merged:
+            for c in SUM_COLUMNS:
+                merged[key][c] += d[c]
+        else:
+            merged[key] = dict(d)
+
+    now = datetime.utcnow()
+    rows = [{**row, "updated_at": now} for row in merged.values()]
+
+    upsert_add(
+        AcademicRollup,
+        rows,
+        key_columns=KEY_COLUMNS,
+        sum_columns=SUM_COLUMNS,
+        replace_columns=("updated_at",),
+    )
+
+
+def move_student_rollups(user_id, school_id, grade, section):
+    """
+    Re-files a student's rollups under their new school/grade/section: the
+    per-student rows move there and the old section rows hand the student's
+    quizzes over to the new section rows, so section figures keep covering
+    current members. Call whenever a student changes section. Caller commits.
+    """
+    new_key = {"school_id": school_id or 0, "grade": grade or "", "section": section or ""}
+    rows = AcademicRollup.query.filter(
+        AcademicRollup.user_id == user_id,
+        db.or_(*(getattr(AcademicRollup, c) != v for c, v in new_key.items())),
+    ).all()
+    if not rows:
+        return
+
+    deltas = []
+    old_keys = set()
+    for row in rows:
+        base = {"subject": row.subject, "period": row.period, "period_start": row.period_start}
+        sums = {c: getattr(row, c) for c in SUM_COLUMNS}
+        old_key = {"school_id": row.school_id, "grade": row.grade, "section": row.section}
+        old_keys.add(tuple(old_key.values()))
+
+        deltas.append({**base, **old_key, "user_id": SECTION_ROW, **{c: -v for c, v in sums.items()}})
+        deltas.append({**base, **new_key, "user_id": SECTION_ROW, **sums})
+        deltas.append({**base, **new_key, "user_id": user_id, **sums})
+
+    AcademicRollup.query.filter(
+        AcademicRollup.id.in_([row.id for row in rows])
+    ).delete(synchronize_session=False)
+    apply_rollup_deltas(deltas)
+
+    # Old section rows only this student contributed to are now empty
+    for school, old_grade, old_section in old_keys:
+        AcademicRollup.query.filter(
+            *section_scope(school, old_grade, old_section),
+            AcademicRollup.quiz_count <= 0,
+        ).delete(synchronize_session=False)
+
+
+def section_scope(school_id, grade=None, section=None):
+    """Filters selecting whole-section rollup rows of a school (optionally one grade/section)."""
+    filters = [
+        AcademicRollup.user_id == SECTION_ROW,
+        AcademicRollup.school_id == (school_id or 0),
+    ]
+    if grade is not None:
+        filters.append(AcademicRollup.grade == grade)
+    if section is not None:
+        filters.append(AcademicRollup.section == section)
+    return filters
+
+
+def student_scope(student_id):
+    return [AcademicRollup.user_id == student_id]
@@ -0,0 +1,125 @@
+# backend/services/section_data.py
+from collections import defaultdict
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from backend.models import db, User, StudentProfile, QuizResult, QuizTopicResult, Activity
+from .ai_pipeline import build_student_profile
+from .chat_analysis import analyze_chat, students_chat_insights
+
+
+def fetch_section_students(school_id, grade, section):
+    """
+    Students of one grade/section in a school, with their profile row
+    loaded in the same query.
+    """
+    return (
+        User.query
+        .join(StudentProfile)
+        .options(joinedload(User.student_profile))
+        .filter(
+            User.role == "student",
+            User.school_id == school_id,
+            StudentProfile.grade == grade,
+            StudentProfile.section == section
+        )
+        .order_by(User.id)
+        .all()
+    )
+
+
+def load_section_data(students):
+    """
+    Batch-loads quiz, chat and activity data for a set of students using a
+    constant number of queries, whatever the size of the section. Chat data
+    comes from the scores stored on each ChatLog, not the raw messages.
+
+    Returns:
+    {
+        "latest_quizzes": {user_id: [{"topic": ..., "correct": ..., "total": ...}]},
+        "chat_insights": {user_id: {"sentiment_score": ..., "curiosity_level": ..., "help_requests": ...}},
+        "activities": {user_id: [Activity, ...]}
+    }
+    """
+    student_ids = [s.id for s in students]
+    data = {
+        "latest_quizzes": {},
+        "chat_insights": {},
+        "activities": defaultdict(list),
+    }
+    if not student_ids:
+        return data
+
+    # ---- Latest quiz per student ----
+    latest = (
+        db.session.query(
+            QuizResult.user_id,
+            func.max(QuizResult.taken_at).label("taken_at")
+        )
+        .filter(QuizResult.user_id.in_(student_ids))
+        .group_by(QuizResult.user_id)
+        .subquery()
+    )
+
+    # Several quizzes at the latest timestamp: the last inserted one wins
+    latest_quiz_ids = dict(
+        db.session.query(QuizResult.user_id, func.max(QuizResult.id))
+        .join(
+            latest,
+            db.and_(
+                QuizResult.user_id == latest.c.user_id,
+                QuizResult.taken_at == latest.c.taken_at
+            )
+        )
+        .group_by(QuizResult.user_id)
+        .all()
+    )
+
+    for user_id in latest_quiz_ids:
+        data["latest_quizzes"][user_id] = []
+
+    if latest_quiz_ids:
+        for entry in (
+            QuizTopicResult.query
+            .filter(QuizTopicResult.quiz_result_id.in_(list(latest_quiz_ids.values())))
+            .order_by(QuizTopicResult.id)
+        ):
+            data["latest_quizzes"][entry.user_id].append(entry.to_dict())
+
+    # ---- Chat insights ----
+    data["chat_insights"] = students_chat_insights(student_ids)
+
+    # ---- Activities ----
+    activities = Activity.query.filter(Activity.user_id.in_(student_ids)).all()
+    for a in activities:
+        data["activities"][a.user_id].append(a)
+
+    return data
+
+
+def section_student_info(student):
+    return {
+        "name": student.name,
+        "grade": student.student_profile.grade,
+        "age": student.student_profile.age,
+        "profilePicUrl": student.student_profile.profile_pic_url
+    }
+
+
+def build_section_profiles(students, data):
+    """
+    Builds a dashboard profile for every student from batch-loaded data.
+    Returns a list of (student, quiz_data, profile) in the order of `students`.
+    """
+    results = []
+    for student in students:
+        quiz_data = data["latest_quizzes"].get(student.id, [])
+        profile = build_student_profile(
+            quiz_data=quiz_data,
+            chat_insights=data["chat_insights"].get(student.id) or analyze_chat([]),
+            student_info=section_student_info(student),
+            activities=data["activities"].get(student.id, []),
+        )
+        results.append((student, quiz_data, profile))
+    return results
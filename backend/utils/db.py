@@ -0,0 +1,50 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from backend.models import db
+
+
+def insert_ignore(model):
+    """
+    INSERT statement for `model` that silently skips rows violating a
+    unique constraint (ON CONFLICT DO NOTHING on Postgres and SQLite).
+    Execute it with a list of dicts to get a single executemany.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        return pg_insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite_insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+
+def upsert_add(model, rows, key_columns, sum_columns, replace_columns=()):
+    """
+    Inserts `rows` (list of dicts) into `model`; when a row's `key_columns`
+    already exist, adds its `sum_columns` onto the stored values and
+    overwrites `replace_columns` instead. Rows must have unique keys.
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    dialect = db.engine.dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(model)
+        set_ = {c: table.c[c] + stmt.excluded[c] for c in sum_columns}
+        set_.update({c: stmt.excluded[c] for c in replace_columns})
+        stmt = stmt.on_conflict_do_update(index_elements=list(key_columns), set_=set_)
+        db.session.execute(stmt, rows)
+        return
+
+    # Portable fallback: one lookup per row
+    for row in rows:
+        existing = model.query.filter_by(**{c: row[c] for c in key_columns}).first()
+        if existing is None:
+            db.session.add(model(**row))
+            continue
+        for c in sum_columns:
+            setattr(existing, c, (getattr(existing, c) or 0) + row[c])
+        for c in replace_columns:
+            setattr(existing, c, row[c])
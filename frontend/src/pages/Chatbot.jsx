@@ -1,6 +1,6 @@
 import React, { useState, useRef, useEffect } from "react";
 import { Send } from "lucide-react";
-import { chatBot, sendChatData } from "../services/api";
+import { chatBotStream } from "../services/api";
 import { useTheme, getThemeClasses } from "../contexts/ThemeContext";
 
 const Chatbot = () => {
@@ -11,28 +11,11 @@ const Chatbot = () => {
   });
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
   const messagesEndRef = useRef(null);
 
   const { bg, text, border, bgSecondary, barBg, textThird, textFourth } = getThemeClasses(theme);
 
-  // Sync with Backend
-  const persistChat = async (chatHistory) => {
-    try {
-      await sendChatData(
-        chatHistory.map(m => ({
-          user_message: m.sender === "user" ? m.text : null,
-          bot_response: m.sender === "bot" ? m.text : null
-        }))
-      );
-    } catch (err) {
-      console.error("Chat sync failed:", err);
-    }
-  };
-
-  useEffect(() => {
-    if (messages.length > 1) persistChat(messages);
-  }, [messages]);
-
   useEffect(() => {
     localStorage.setItem("chat_messages", JSON.stringify(messages));
   }, [messages]);
@@ -59,13 +42,28 @@ const Chatbot = () => {
     setInput("");
     setLoading(true);
 
+    // The reply bubble appears with the first chunk and grows as the rest
+    // streams in; the server stores the finished turn itself.
+    let started = false;
     try {
-      const data = await chatBot(userText);
-      setMessages((prev) => [...prev, { sender: "bot", text: data || "⚠️ No response from AI" }]);
+      const reply = await chatBotStream(userText, (token) => {
+        const first = !started;
+        started = true;
+        setStreaming(true);
+        setMessages((prev) => {
+          if (first) return [...prev, { sender: "bot", text: token }];
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, text: last.text + token }];
+        });
+      });
+      if (!started) {
+        setMessages((prev) => [...prev, { sender: "bot", text: reply || "⚠️ No response from AI" }]);
+      }
     } catch (error) {
       setMessages((prev) => [...prev, { sender: "bot", text: "❌ Error: Unable to reach server." }]);
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
@@ -106,7 +104,7 @@ const Chatbot = () => {
           </div>
         ))}
 
-        {loading && (
+        {loading && !streaming && (
           <div className="flex justify-start">
             <div className={`${bgSecondary} ${textThird} px-4 py-3 rounded-2xl rounded-tl-none`}>
               <div className="flex items-center space-x-2">
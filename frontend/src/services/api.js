@@ -124,6 +124,54 @@ export const chatBot = async (prompt) => {
   return json.response;
 };
 
+// Streams a reply from /chat-bot/stream (server-sent events): onToken(chunk) is
+// called for every chunk as the model writes it, and the promise resolves with
+// the full reply once the server has saved the turn (ChatLog included).
+export const chatBotStream = async (prompt, onToken) => {
+  const res = await fetchWithRefresh(`${BASE_URL}/chat-bot/stream`, {
+    method: "POST",
+    headers: getAuthHeaders(),
+    body: JSON.stringify({ prompt }),
+  });
+
+  if (!res.ok) {
+    const errorBody = await res.json().catch(() => ({}));
+    throw new Error(`Chatbot error! Status: ${res.status}. ${errorBody.error || 'Server error.'}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let end;
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const rawEvent = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of rawEvent.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === "error") throw new Error(payload.error || "Chatbot stream failed.");
+      if (event === "done") return payload.response;
+      onToken(payload.token);
+    }
+  }
+
+  throw new Error("Chatbot stream ended before the reply was complete.");
+};
+
 // NOTE: The backend did not have a /mood endpoint. Keeping this function as is,
 // but it will likely return a 404 until that route is implemented.
 export const mood = async (userId, mood) => {
@@ -633,9 +681,13 @@ export const getMessages = async () => {
 };
 
 
-export const getMessageThread = async (userId) => {
+// One page of a thread, oldest first: the newest messages, or those older than
+// `before` (the nextCursor of the previous page). nextCursor is null once the
+// page reaches the start of the conversation.
+export const getMessageThread = async (userId, before = null) => {
+  const query = before ? `?before=${encodeURIComponent(before)}` : "";
   const res = await fetchWithRefresh(
-    `${BASE_URL}/messages/thread/${userId}`,
+    `${BASE_URL}/messages/thread/${userId}${query}`,
     {
       method: "GET",
       headers: getAuthHeaders(),
@@ -646,7 +698,8 @@ export const getMessageThread = async (userId) => {
     throw new Error("Failed to fetch messages");
   }
 
-  return await res.json();
+  const messages = await res.json();
+  return { messages, nextCursor: res.headers.get("X-Next-Cursor") };
 };
 
 
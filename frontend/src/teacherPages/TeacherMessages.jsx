@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useRef } from "react";
+import React, { useEffect, useLayoutEffect, useState, useRef } from "react";
 import { Send, UserCircle, Plus, Loader2, ChevronLeft } from "lucide-react";
 import { motion } from "framer-motion";
 import { useTheme, getThemeClasses } from "../contexts/ThemeContext";
@@ -40,12 +40,25 @@ export default function TeacherMessages() {
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
   const [showNewChat, setShowNewChat] = useState(false);
+  const [olderCursor, setOlderCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
 
   const user = JSON.parse(localStorage.getItem("user"));
   const messagesEndRef = useRef(null);
+  const scrollRef = useRef(null);
+  const lastScrollTopRef = useRef(0);
+  const keepScrollRef = useRef(null); // distance from the bottom to keep after prepending older messages
+  const activeThreadRef = useRef(null);
 
   /* ---------------- Auto Scroll ---------------- */
-  useEffect(() => {
+  useLayoutEffect(() => {
+    const container = scrollRef.current;
+    if (keepScrollRef.current !== null && container) {
+      // Older page prepended: keep the messages being read where they were
+      container.scrollTop = container.scrollHeight - keepScrollRef.current;
+      keepScrollRef.current = null;
+      return;
+    }
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages]);
 
@@ -99,11 +112,14 @@ export default function TeacherMessages() {
   /* ---------------- Load Message Thread ---------------- */
   useEffect(() => {
     if (!activeUser) return;
+    activeThreadRef.current = activeUser.userId;
+    setOlderCursor(null);
     async function loadThread() {
       try {
         setLoading(true);
-        const data = await getMessageThread(activeUser.userId);
-        setMessages(data);
+        const { messages: page, nextCursor } = await getMessageThread(activeUser.userId);
+        setMessages(page);
+        setOlderCursor(nextCursor);
       } catch (err) {
         console.error("Failed to load messages", err);
       } finally {
@@ -113,6 +129,32 @@ export default function TeacherMessages() {
     loadThread();
   }, [activeUser]);
 
+  /* ---------------- Load Older Messages (scroll back) ---------------- */
+  const loadOlderMessages = async () => {
+    if (!activeUser || !olderCursor || loadingOlder) return;
+    const threadUserId = activeUser.userId;
+    try {
+      setLoadingOlder(true);
+      const { messages: older, nextCursor } = await getMessageThread(threadUserId, olderCursor);
+      if (activeThreadRef.current !== threadUserId) return; // switched conversations meanwhile
+      const container = scrollRef.current;
+      keepScrollRef.current = container ? container.scrollHeight - container.scrollTop : null;
+      setMessages((prev) => [...older, ...prev]);
+      setOlderCursor(nextCursor);
+    } catch (err) {
+      console.error("Failed to load older messages", err);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
+  const handleMessagesScroll = (e) => {
+    const { scrollTop } = e.currentTarget;
+    const scrollingUp = scrollTop < lastScrollTopRef.current;
+    lastScrollTopRef.current = scrollTop;
+    if (scrollingUp && scrollTop < 80) loadOlderMessages();
+  };
+
   /* ---------------- Send Message ---------------- */
   const handleSend = async () => {
     if (!input.trim() || !activeUser) return;
@@ -215,7 +257,16 @@ export default function TeacherMessages() {
         </div>
 
         {/* MESSAGES AREA */}
-        <div className="flex-1 overflow-y-auto p-4 md:p-6 space-y-6 bg-transparent">
+        <div
+          ref={scrollRef}
+          onScroll={handleMessagesScroll}
+          className="flex-1 overflow-y-auto p-4 md:p-6 space-y-6 bg-transparent"
+        >
+          {loadingOlder && (
+            <div className={`flex justify-center ${textSecondary}`}>
+              <Loader2 className="animate-spin w-4 h-4 text-blue-500" />
+            </div>
+          )}
           {messages.map((m, idx) => {
             const isMe = m.senderId === user.id;
             const currentDate = new Date(m.createdAt).toDateString();